@@ -0,0 +1,62 @@
+"""Compare ScriptsMenu.add_scripts with calling add_script per item
+
+Runs without a display using the Qt offscreen platform:
+
+    python benchmarks/bench_add_scripts.py
+
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "python"))
+
+from scriptsmenu import ScriptsMenu  # noqa: E402
+from scriptsmenu.vendor.Qt import QtWidgets  # noqa: E402
+
+SIZES = (1000, 10000, 50000)
+
+
+def make_scripts(count):
+    return [{"title": "Script {}".format(index),
+             "command": "print({})".format(index),
+             "sourcetype": "python",
+             "tags": ["tag{}".format(index % 97), "bench"]}
+            for index in range(count)]
+
+
+def bench_add_script(scripts):
+    menu = ScriptsMenu(title="Benchmark")
+    start = time.perf_counter()
+    for script in scripts:
+        menu.add_script(parent=menu, **script)
+    duration = time.perf_counter() - start
+    menu.deleteLater()
+    return duration
+
+
+def bench_add_scripts(scripts):
+    menu = ScriptsMenu(title="Benchmark")
+    start = time.perf_counter()
+    menu.add_scripts(menu, scripts)
+    duration = time.perf_counter() - start
+    menu.deleteLater()
+    return duration
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    print("{:>8} {:>14} {:>14}".format("actions", "add_script", "add_scripts"))
+    for size in SIZES:
+        scripts = make_scripts(size)
+        single = bench_add_script(scripts)
+        app.processEvents()
+        bulk = bench_add_scripts(scripts)
+        app.processEvents()
+        print("{:>8} {:>12.3f} s {:>12.3f} s".format(size, single, bulk))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Check that incremental search finds the same items as a full search
+
+Simulates typing sessions on a generated index: queries are typed one
+character at a time, extended, backspaced and replaced while items are
+added, removed and given other tags in between. After every keystroke the results of
+`IncrementalSearch.query` must equal `SearchIndex.query` and a plain scan
+of the tags of every item:
+
+    python benchmarks/check_incremental_search.py --sessions 200
+
+Exits with 1 at the first difference.
+
+"""
+import os
+import sys
+import random
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "python"))
+sys.path.insert(0, HERE)
+
+import generate  # noqa: E402
+from scriptsmenu import searchindex  # noqa: E402
+
+
+def scan(entries, text):
+    """Return the items with a tag containing the text, tag by tag"""
+    if not text:
+        return set(entries)
+    return set(item for item, tags in entries.items()
+               if any(text in tag for tag in tags))
+
+
+def make_tags(rng, index):
+    return generate.make_tags(rng, rng.randint(1, 6)) + ["tool {}".format(
+        index)]
+
+
+def keystrokes(rng, tags):
+    """Yield the texts of the search field while typing a session"""
+    text = ""
+    for _ in range(rng.randint(5, 30)):
+        action = rng.random()
+        if action < 0.5 or not text:
+            # Type the next character of a tag or a random one
+            tag = rng.choice(tags)
+            if tag.startswith(text) and len(tag) > len(text):
+                text += tag[len(text)]
+            else:
+                text += rng.choice("abcdefghijklmnopqrstuvwxyz0123456789 ")
+        elif action < 0.8:
+            text = text[:-1]
+        elif action < 0.9:
+            # Replace the query, like selecting all and typing
+            text = rng.choice(tags)[:rng.randint(1, 3)]
+        else:
+            text = ""
+        yield text
+
+
+def check(sessions, size, seed):
+    """Run the typing sessions
+
+    Returns:
+        str: a description of the first difference, None when all match
+
+    """
+
+    rng = random.Random(seed)
+    index = searchindex.SearchIndex()
+    incremental = searchindex.IncrementalSearch(index)
+
+    entries = dict()
+    for item in range(size):
+        entries[item] = make_tags(rng, item)
+        index.add(item, entries[item])
+    next_item = size
+
+    all_tags = sorted(set(tag for tags in entries.values() for tag in tags))
+
+    for session in range(sessions):
+        for step, text in enumerate(keystrokes(rng, all_tags)):
+
+            # Change the index between keystrokes now and then
+            if rng.random() < 0.1:
+                change = rng.random()
+                if entries and change < 0.4:
+                    item = rng.choice(list(entries))
+                    index.remove(item)
+                    del entries[item]
+                elif entries and change < 0.6:
+                    # Replace the tags of an indexed item, like setting the
+                    # tags of an action
+                    item = rng.choice(list(entries))
+                    entries[item] = make_tags(rng, item)
+                    index.add(item, entries[item])
+                else:
+                    item = next_item
+                    next_item += 1
+                    entries[item] = make_tags(rng, item)
+                    index.add(item, entries[item])
+
+            found = incremental.query(text)
+            expected = scan(entries, text)
+            if set(found) != expected or index.query(text) != expected:
+                return ("Session {} step {} query '{}': {} found, {} "
+                        "expected, {} missing, {} extra".format(
+                            session, step, text, len(found), len(expected),
+                            len(expected - set(found)),
+                            len(set(found) - expected)))
+
+    return None
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200,
+                        help="number of typing sessions")
+    parser.add_argument("--size", type=int, default=2000,
+                        help="number of indexed items")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the random generator")
+    args = parser.parse_args(args)
+
+    difference = check(args.sessions, args.size, args.seed)
+    if difference is not None:
+        print(difference)
+        return 1
+
+    print("{} sessions matched".format(args.sessions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
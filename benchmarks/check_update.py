@@ -0,0 +1,120 @@
+"""Check that a failing configuration update leaves a menu that updates again
+
+Updates a menu with configurations which fail part way, on a new action,
+inside a new submenu and on a changed action, followed by an update with a
+valid configuration. The valid update must match the items already built
+instead of adding them a second time. Runs without a display using the Qt
+offscreen platform:
+
+    python benchmarks/check_update.py
+
+Exits with 1 at the first difference.
+
+"""
+import os
+import sys
+import argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "python"))
+
+from scriptsmenu import ScriptsMenu  # noqa: E402
+from scriptsmenu.vendor.Qt import QtWidgets  # noqa: E402
+
+
+def make_action(title, **kwargs):
+    item = {"type": "action",
+            "title": title,
+            "command": "result = '{}'".format(title),
+            "sourcetype": "python"}
+    item.update(kwargs)
+    return item
+
+
+def make_menu(title, items):
+    return {"type": "menu", "title": title, "items": items}
+
+
+# Mel scripts can only run on the main thread, building this action fails
+INVALID = make_action("Invalid", sourcetype="mel", execution="thread")
+
+GOOD = [make_action("A"),
+        make_action("B"),
+        make_menu("Menu", [make_action("C"), make_action("D")])]
+
+FAILING = [
+    ("new action", [make_action("A"), make_action("B"), INVALID]),
+    ("new submenu", [make_action("A"),
+                     make_menu("Other", [make_action("E"), INVALID])]),
+    ("changed action", GOOD[:2] + [make_menu("Menu", [
+        make_action("C", tooltip="Changed"),
+        make_action("D", sourcetype="mel", execution="thread")])]),
+]
+
+
+def titles(menu):
+    """Return the titles below a menu, submenus as (title, titles)"""
+    result = []
+    for item in menu.actions():
+        submenu = item.menu()
+        if submenu is not None:
+            result.append((item.text(), titles(submenu)))
+        elif item.text():
+            result.append(item.text())
+    return result
+
+
+def check():
+    """Run every failing update followed by the valid one
+
+    Returns:
+        str: a description of the first difference, None when all match
+
+    """
+
+    menu = ScriptsMenu(title="Update")
+    menu.build_from_configuration(menu, GOOD)
+    expected = titles(menu)
+
+    for name, configuration in FAILING:
+        try:
+            menu.update_from_configuration(menu, configuration)
+        except (AssertionError, RuntimeError):
+            pass
+        else:
+            return "Updating with the {} did not fail".format(name)
+
+        counts = menu.update_from_configuration(menu, GOOD)
+        found = titles(menu)
+        if found != expected:
+            return "After the {}: {} found, {} expected".format(
+                name, found, expected)
+
+        # Nothing is left to change in a second update
+        counts = menu.update_from_configuration(menu, GOOD)
+        if any(counts.values()):
+            return "After the {}: {} repeating the update".format(
+                name, counts)
+
+    return None
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args(args)
+
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    difference = check()
+    if difference is not None:
+        print(difference)
+        return 1
+
+    print("{} failing updates recovered".format(len(FAILING)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
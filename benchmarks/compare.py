@@ -0,0 +1,58 @@
+"""Compare two benchmark result files written by run_benchmarks.py
+
+    python benchmarks/compare.py before.json after.json --threshold 1.2
+
+Exits with 1 when an operation got slower than the threshold allows.
+
+"""
+import sys
+import json
+import argparse
+
+
+def load(path):
+    with open(path, "r") as f:
+        data = json.load(f)
+    return data["metadata"], {(result["case"], result["operation"]): result
+                              for result in data["results"]}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before", help="result file of the baseline")
+    parser.add_argument("after", help="result file to compare")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="time ratio above which an operation is a "
+                             "regression")
+    args = parser.parse_args(args)
+
+    before_meta, before = load(args.before)
+    after_meta, after = load(args.after)
+
+    print("before: {} ({})".format(before_meta.get("commit"),
+                                   before_meta.get("time")))
+    print("after:  {} ({})".format(after_meta.get("commit"),
+                                   after_meta.get("time")))
+    print("{:<8} {:<20} {:>11} {:>11} {:>7} {:>8}".format(
+        "case", "operation", "before", "after", "time", "memory"))
+
+    regressions = []
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        ratio = new["median"] / old["median"] if old["median"] else 0.0
+        memory = (float(new["peak_memory"]) / old["peak_memory"]
+                  if old["peak_memory"] else 0.0)
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  <-- slower"
+            regressions.append(key)
+
+        print("{:<8} {:<20} {:>8.2f} ms {:>8.2f} ms {:>6.2f}x {:>7.2f}x{}"
+              .format(key[0], key[1], old["median"] * 1000,
+                      new["median"] * 1000, ratio, memory, flag))
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
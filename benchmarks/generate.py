@@ -0,0 +1,87 @@
+"""Generate synthetic scripts menu configurations for benchmarking
+
+The configurations follow the schema of the samples folder: nested `menu`
+items holding `action` items with tags, tooltips and an occasional
+`separator`.
+
+"""
+import os
+import random
+
+WORDS = ("anim", "rig", "model", "light", "render", "layout", "fx", "comp",
+         "cache", "export", "import", "publish", "check", "clean", "select",
+         "rename", "pose", "shader", "texture", "camera", "scene", "asset",
+         "shot", "review", "sync", "bake", "blend", "curve", "joint", "mesh")
+
+
+def make_tags(rng, count):
+    """Return `count` tags combined from the word list"""
+    return ["{}{}".format(rng.choice(WORDS), rng.randint(0, 99))
+            for _ in range(count)]
+
+
+def make_configuration(size, depth=2, tags=4, branches=8, file_ratio=0.0,
+                       script_dir=None, seed=0):
+    """Return a configuration with `size` actions spread over nested menus
+
+    Args:
+        size (int): number of actions
+        depth (int): number of menu levels below the root
+        tags (int): number of tags per action
+        branches (int): number of submenus per menu
+        file_ratio (float): fraction of actions of sourcetype `file`
+        script_dir (str): folder holding the scripts of `file` actions
+        seed (int): seed of the random generator
+
+    Returns:
+        list
+
+    """
+
+    rng = random.Random(seed)
+    counter = iter(range(size))
+
+    def make_action():
+        index = next(counter)
+        if script_dir and rng.random() < file_ratio:
+            command = os.path.join(script_dir, "tool_{}.py".format(index % 20))
+            sourcetype = "file"
+        else:
+            command = "result = {}".format(index)
+            sourcetype = "python"
+
+        return {"type": "action",
+                "title": "Tool {}".format(index),
+                "command": command,
+                "sourcetype": sourcetype,
+                "tags": make_tags(rng, tags),
+                "tooltip": "Run tool {}".format(index)}
+
+    def make_items(level, count):
+        if level == depth or count <= branches:
+            items = [make_action() for _ in range(count)]
+            if len(items) > 4:
+                items.insert(len(items) // 2, {"type": "separator"})
+            return items
+
+        items = []
+        share, remainder = divmod(count, branches)
+        for branch in range(branches):
+            amount = share + (1 if branch < remainder else 0)
+            if not amount:
+                continue
+            items.append({"type": "menu",
+                          "title": "Menu {}.{}".format(level, branch),
+                          "items": make_items(level + 1, amount)})
+        return items
+
+    return make_items(0, size)
+
+
+def write_scripts(script_dir, count=20):
+    """Write the scripts used by the `file` actions"""
+    for index in range(count):
+        name = "tool_{}".format(index)
+        path = os.path.join(script_dir, "{}.py".format(name))
+        with open(path, "w") as f:
+            f.write("def {}():\n    return {}\n".format(name, index))
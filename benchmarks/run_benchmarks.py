@@ -0,0 +1,230 @@
+"""Benchmark building, searching, updating and clicking a scripts menu
+
+Runs without a display using the Qt offscreen platform and writes the
+results as JSON, which can be compared between commits with compare.py:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json
+    python benchmarks/compare.py before.json after.json
+
+"""
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "python"))
+sys.path.insert(0, HERE)
+
+import generate  # noqa: E402
+from scriptsmenu import ScriptsMenu, version  # noqa: E402
+from scriptsmenu.scriptsmenu import load_configuration  # noqa: E402
+from scriptsmenu.vendor import Qt  # noqa: E402
+
+# name, actions, depth, tags per action
+CASES = (("small", 1000, 2, 3),
+         ("medium", 5000, 3, 5),
+         ("large", 20000, 4, 8))
+
+QUERY = "anim12"
+
+
+class Benchmark(object):
+    """Run the operations of a single case"""
+
+    def __init__(self, app, name, size, depth, tags, workdir, repeat):
+
+        self.app = app
+        self.name = name
+        self.size = size
+        self.depth = depth
+        self.tags = tags
+        self.repeat = repeat
+
+        self.script_dir = os.path.join(workdir, "scripts")
+        if not os.path.isdir(self.script_dir):
+            os.makedirs(self.script_dir)
+            generate.write_scripts(self.script_dir)
+
+        self.configuration = generate.make_configuration(
+            size, depth=depth, tags=tags, file_ratio=0.1,
+            script_dir=self.script_dir)
+
+        self.path = os.path.join(workdir, "{}.json".format(name))
+        with open(self.path, "w") as f:
+            json.dump(self.configuration, f, indent=4)
+
+        os.environ["SCRIPTSMENU_CACHE"] = os.path.join(workdir, "cache")
+
+    def operations(self):
+        """Return the operations as (name, setup, function) tuples"""
+        return (
+            ("load_json", None,
+             lambda _: load_configuration(self.path)),
+            ("load_cached", self._warm_cache,
+             lambda _: load_configuration(self.path, cache=True)),
+            ("build", self._new_menu, self._build),
+            ("build_lazy", self._new_menu, self._build_lazy),
+            ("search", self._built_menu, self._search),
+            ("update_unchanged", self._built_menu, self._update),
+            ("clear_menu", self._built_menu,
+             lambda menu: menu.clear_menu()),
+            ("run_command_python", self._python_actions, self._click),
+            ("run_command_file", self._file_actions, self._click),
+        )
+
+    def run(self):
+        results = []
+        for name, setup, function in self.operations():
+            result = measure(function, setup, self.repeat, self.app)
+            result.update({"case": self.name,
+                           "operation": name,
+                           "actions": self.size,
+                           "depth": self.depth,
+                           "tags": self.tags})
+            results.append(result)
+            print("{:<8} {:<20} {:>10.2f} ms {:>10.1f} KiB".format(
+                self.name, name, result["median"] * 1000,
+                result["peak_memory"] / 1024.0))
+        return results
+
+    def _warm_cache(self):
+        load_configuration(self.path, cache=True)
+
+    def _new_menu(self):
+        return ScriptsMenu(title="Benchmark")
+
+    def _built_menu(self):
+        menu = self._new_menu()
+        menu.build_from_configuration(menu, self.configuration)
+        return menu
+
+    def _build(self, menu):
+        menu.build_from_configuration(menu, self.configuration)
+
+    def _build_lazy(self, menu):
+        menu.build_from_configuration(menu, self.configuration, lazy=True)
+
+    def _search(self, menu):
+        # Type the query, remove it again and clear the search
+        for end in list(range(1, len(QUERY) + 1)) + [3, 0]:
+            menu.searchbar.setText(QUERY[:end])
+
+    def _update(self, menu):
+        menu.update_from_configuration(menu,
+                                       copy.deepcopy(self.configuration))
+
+    def _python_actions(self):
+        return self._actions("python")
+
+    def _file_actions(self):
+        return self._actions("file")
+
+    def _actions(self, sourcetype):
+        menu = self._built_menu()
+        actions = [action for action in menu._script_actions
+                   if action.sourcetype == sourcetype][:100]
+        return menu, actions
+
+    def _click(self, state):
+        menu, actions = state
+        for action in actions:
+            action.run_command()
+
+
+def measure(function, setup, repeat, app):
+    """Return the wall times and peak memory of running a function
+
+    Setup runs before every call and is not measured. Memory is measured
+    in a separate run as tracing slows down the code.
+
+    """
+
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        function(state)
+        times.append(time.perf_counter() - start)
+        del state
+        app.processEvents()
+
+    state = setup() if setup else None
+    tracemalloc.start()
+    function(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    app.processEvents()
+
+    return {"min": min(times),
+            "median": statistics.median(times),
+            "max": max(times),
+            "repeat": repeat,
+            "peak_memory": peak}
+
+
+def get_metadata():
+    """Return the environment the benchmarks ran in"""
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=HERE,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {"commit": commit,
+            "version": version.version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "binding": Qt.__binding__,
+            "binding_version": Qt.__binding_version__,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_output.json",
+                        help="file to write the results to")
+    parser.add_argument("--cases", nargs="+",
+                        choices=[case[0] for case in CASES],
+                        help="only run these cases")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of timed runs per operation")
+    args = parser.parse_args(args)
+
+    app = Qt.QtWidgets.QApplication.instance() or \
+        Qt.QtWidgets.QApplication([])
+
+    workdir = tempfile.mkdtemp(prefix="scriptsmenu_bench_")
+    results = []
+    try:
+        for name, size, depth, tags in CASES:
+            if args.cases and name not in args.cases:
+                continue
+            benchmark = Benchmark(app, name, size, depth, tags, workdir,
+                                  args.repeat)
+            results.extend(benchmark.run())
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump({"metadata": get_metadata(), "results": results}, f,
+                  indent=4)
+
+    print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
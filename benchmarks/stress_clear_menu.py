@@ -0,0 +1,133 @@
+"""Rebuild a scripts menu many times and check that clearing it leaks nothing
+
+Every cycle builds a generated configuration, eagerly or lazily, searches
+it, updates it and clears the menu again. The live objects and the Python
+memory of the menu must be the same after the last cycle as after the
+first ones. Runs without a display using the Qt offscreen platform:
+
+    python benchmarks/stress_clear_menu.py --cycles 300
+
+Exits with 1 when objects or memory keep growing.
+
+"""
+import os
+import sys
+import copy
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "python"))
+sys.path.insert(0, HERE)
+
+import generate  # noqa: E402
+from scriptsmenu import ScriptsMenu  # noqa: E402
+from scriptsmenu.vendor.Qt import QtWidgets, QtCore  # noqa: E402
+
+
+def make_configuration(size, depth, script_dir):
+    """Return a generated configuration with icons on the root actions"""
+    configuration = generate.make_configuration(
+        size, depth=depth, tags=4, file_ratio=0.1, script_dir=script_dir)
+    icon = os.path.join(script_dir, "icon.png")
+    configuration.extend({"type": "action",
+                          "title": "Root {}".format(index),
+                          "command": "result = {}".format(index),
+                          "sourcetype": "python",
+                          "icon": icon}
+                         for index in range(10))
+    return configuration
+
+
+def cycle(menu, configuration, index):
+    """Build, search, update and clear the menu once"""
+    menu.build_from_configuration(menu, configuration, lazy=index % 2 == 1)
+    for text in ("to", "tool 1", ""):
+        menu.searchbar.setText(text)
+    menu.update_from_configuration(menu, copy.deepcopy(configuration))
+    menu.aboutToShow.emit()
+    menu.clear_menu()
+
+
+def collect(app):
+    """Delete the objects scheduled for deletion"""
+    app.processEvents()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=300,
+                        help="number of rebuild cycles")
+    parser.add_argument("--actions", type=int, default=2000,
+                        help="number of actions in the configuration")
+    parser.add_argument("--depth", type=int, default=2,
+                        help="number of menu levels")
+    parser.add_argument("--ranked", action="store_true",
+                        help="use ranked search")
+    parser.add_argument("--warmup", type=int, default=50,
+                        help="cycles before the baseline is taken, the "
+                             "interned strings and free lists of Python "
+                             "fill up during these")
+    parser.add_argument("--tolerance", type=int, default=64 * 1024,
+                        help="bytes the memory may grow after the warm-up")
+    args = parser.parse_args(args)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    script_dir = tempfile.mkdtemp(prefix="scriptsmenu_stress_")
+    generate.write_scripts(script_dir)
+    configuration = make_configuration(args.actions, args.depth, script_dir)
+
+    menu = ScriptsMenu(title="Stress")
+    menu.set_ranked_search(args.ranked)
+
+    tracemalloc.start()
+    baseline = None
+    start = time.perf_counter()
+    for index in range(args.cycles):
+        cycle(menu, configuration, index)
+        collect(app)
+
+        if index + 1 == args.warmup:
+            baseline = (menu.memory_usage(),
+                        tracemalloc.get_traced_memory()[0])
+        if (index + 1) % 50 == 0:
+            usage = menu.memory_usage()
+            print("{:>6} cycles {:>8} Qt objects {:>10.1f} KiB".format(
+                index + 1, usage["qt_objects"],
+                tracemalloc.get_traced_memory()[0] / 1024.0))
+
+    duration = time.perf_counter() - start
+    usage = menu.memory_usage()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("{} cycles in {:.2f} s".format(args.cycles, duration))
+    for key, value in sorted(usage.items()):
+        print("  {:<16} {}".format(key, value))
+
+    if baseline is None:
+        print("Not enough cycles to compare, run more than {}".format(
+            args.warmup))
+        return 0
+
+    before, before_memory = baseline
+    leaked = [key for key, value in usage.items()
+              if key != "bytes" and value > before[key]]
+    growth = memory - before_memory
+    print("Memory growth after {} cycles: {:.1f} KiB".format(
+        args.warmup, growth / 1024.0))
+
+    if leaked or growth > args.tolerance:
+        print("Leaking: {}".format(", ".join(leaked) or "memory"))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,14 @@
-from .scriptsmenu import ScriptsMenu
 from . import version
 
 __all__ = ["ScriptsMenu"]
 __version__ = version.version
+
+
+def __getattr__(name):
+    # The menu is imported on first use so the modules which need no Qt,
+    # like the validation command line, work without a Qt binding
+    if name == "ScriptsMenu":
+        from .scriptsmenu import ScriptsMenu
+        return ScriptsMenu
+    raise AttributeError("module '{}' has no attribute '{}'".format(
+        __name__, name))
@@ -0,0 +1,55 @@
+"""Validate scripts menu configurations without building them
+
+    python -m scriptsmenu studio.json show.json --layers --output report.json
+
+Exits with 1 when any configuration has errors, or warnings with --strict.
+
+"""
+import sys
+import json
+import argparse
+
+from . import validation
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m scriptsmenu",
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="configuration files")
+    parser.add_argument("--layers", action="store_true",
+                        help="check the files as layers merged into one "
+                             "configuration")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, one per CPU by default")
+    parser.add_argument("--no-compile", action="store_true",
+                        help="do not compile Python commands and scripts")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on warnings as well")
+    parser.add_argument("--output", help="write the JSON report to a file, "
+                                         "use - for standard output")
+    args = parser.parse_args(args)
+
+    reports = validation.validate_files(args.paths, merge=args.layers,
+                                        workers=args.workers,
+                                        compile_code=not args.no_compile)
+
+    data = {"reports": [report.as_dict() for report in reports],
+            "errors": sum(len(report.errors) for report in reports),
+            "warnings": sum(len(report.warnings) for report in reports)}
+
+    if args.output == "-":
+        json.dump(data, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+    else:
+        for report in reports:
+            print(report)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(data, f, indent=4)
+
+    failed = data["errors"] or (args.strict and data["warnings"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
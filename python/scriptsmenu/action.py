@@ -1,26 +1,32 @@
 import os
 
 from .vendor.Qt import QtWidgets
+from . import model
 
 
 class Action(QtWidgets.QAction):
-    """Custom Action widget"""
+    """Custom Action widget
 
-    def __init__(self, parent=None):
+    The data of the action is stored in a `model.ScriptItem`, the action
+    only adds the widget and the cached command.
+
+    """
+
+    _COMMAND = """from scriptsmenu import loader
+loader.run_script('{filepath}')"""
+
+    def __init__(self, parent=None, item=None):
 
         QtWidgets.QAction.__init__(self, parent)
 
         self._root = None
-        self._tags = list()
-        self._command = None
-        self._sourcetype = None
-        self._iconfile = None
-        self._label = None
+        if item is None:
+            # Shows no script until an item is set, e.g. a search result
+            item = model.ScriptItem(None, None, None)
+        self._item = item
 
-        self._COMMAND = """import imp
-f, filepath, descr = imp.find_module('{module_name}', ['{dirname}'])
-module = imp.load_module('{module_name}', f, filepath, descr)
-module.{module_name}()"""
+        # Processed command, compiled code and the script's mtime
+        self._cache = None
 
     @property
     def root(self):
@@ -30,17 +36,47 @@ module.{module_name}()"""
     def root(self, value):
         self._root = value
 
+    @property
+    def item(self):
+        return self._item
+
+    @item.setter
+    def item(self, value):
+        """Show another script item with this action
+
+        Args:
+            value (model.ScriptItem): the data of the action
+
+        Returns:
+            None
+
+        """
+        self._item = value
+        self._cache = None
+
+    def _set_values(self, **values):
+        """Show a copy of the script item with the given values changed
+
+        The item can be shared, e.g. with the configuration the menu was
+        built from, so it is not changed in place. The root menu indexes the
+        action again to search the new values.
+
+        """
+        self.item = self._item.copy(**values)
+        if self._root is not None:
+            self._root._reindex_script(self)
+
     @property
     def tags(self):
-        return self._tags
+        return list(self._item.tags)
 
     @tags.setter
     def tags(self, value):
-        self._tags = value
+        self._set_values(tags=value)
 
     @property
     def command(self):
-        return self._command
+        return self._item.command
 
     @command.setter
     def command(self, value):
@@ -53,11 +89,11 @@ module.{module_name}()"""
         Return:
              None
         """
-        self._command = value
+        self._set_values(command=value)
 
     @property
     def sourcetype(self):
-        return self._sourcetype
+        return self._item.sourcetype
 
     @sourcetype.setter
     def sourcetype(self, value):
@@ -71,11 +107,14 @@ module.{module_name}()"""
             None
 
         """
-        self._sourcetype = value
+        self._set_values(sourcetype=value)
 
     @property
     def iconfile(self):
-        return self._iconfile
+        """The path of the icon with its environment variables expanded"""
+        if not self._item.icon:
+            return None
+        return os.path.expandvars(self._item.icon)
 
     @iconfile.setter
     def iconfile(self, value):
@@ -87,11 +126,16 @@ module.{module_name}()"""
         Returns:
             None
         """
-        self._iconfile = value
+        self._set_values(icon=value)
+
+    @property
+    def execution(self):
+        """How the command runs: `main`, `thread` or `process`"""
+        return self._item.execution or "main"
 
     @property
     def label(self):
-        return self._label
+        return self._item.label
 
     @label.setter
     def label(self, value):
@@ -105,7 +149,7 @@ module.{module_name}()"""
             None
 
         """
-        self._label = value
+        self._set_values(label=value)
 
     def run_command(self):
         """
@@ -116,6 +160,10 @@ module.{module_name}()"""
         function will trigger all callbacks. When a callback function returns a
         non zero integer it will not execute the action's command
 
+        Commands with the `thread` or `process` execution run in the
+        background through the root menu, all others on the GUI thread. The
+        run is recorded in the usage statistics of the root menu.
+
         """
 
         # get the current application and its linked keyboard modifiers
@@ -132,7 +180,34 @@ module.{module_name}()"""
                 # Exit function on non-zero return code
                 return
 
-        exec(self.process_command())
+        self._root.record_usage(self)
+
+        if self.execution != "main":
+            self._root.run_in_background(self)
+            return
+
+        exec(self.compiled_command())
+
+    def processed_command(self):
+        """Return the result of `process_command`, cached per action
+
+        Returns:
+            str: a clean command which can be used
+
+        """
+        return self._get_cache()[0]
+
+    def compiled_command(self):
+        """Return the processed command compiled to a code object
+
+        The code is cached until the command or source type change, or for
+        `file` sources when the modification time of the file changes.
+
+        Returns:
+            code: the compiled command
+
+        """
+        return self._get_cache()[1]
 
     def process_command(self):
         """
@@ -154,21 +229,16 @@ module.{module_name}()"""
             str: a clean command which can be used
 
         """
-        if self._sourcetype == "python":
-            return self._command
+        if self.sourcetype == "python":
+            return self.command
 
-        if self._sourcetype == "mel":
+        if self.sourcetype == "mel":
             # Escape single quotes
-            conversion = self._command.replace("'", "\\'")
+            conversion = self.command.replace("'", "\\'")
             return "import maya; maya.mel.eval('{}')".format(conversion)
 
-        if self._sourcetype == "file":
-            if os.path.isabs(self._command):
-                filepath = self._command
-            else:
-                filepath = os.path.normpath(os.path.expandvars(self._command))
-
-            return self._wrap_filepath(filepath)
+        if self.sourcetype == "file":
+            return self._wrap_filepath(self._resolve_filepath())
 
     def has_tag(self, tag):
         """Check whether the tag matches with the action's tags.
@@ -191,6 +261,31 @@ module.{module_name}()"""
 
         return False
 
+    def _resolve_filepath(self):
+        """Return the full path of the script of a `file` source"""
+        return model.resolve_filepath(self.command)
+
+    def _get_mtime(self):
+        """Return the modification time of the script of a `file` source"""
+        if self.sourcetype != "file":
+            return None
+
+        try:
+            return os.path.getmtime(self._resolve_filepath())
+        except OSError:
+            return None
+
+    def _get_cache(self):
+        """Return the processed command, its code and the script mtime"""
+
+        mtime = self._get_mtime()
+        if self._cache is None or self._cache[2] != mtime:
+            command = self.process_command()
+            code = compile(command, "<{}>".format(self.objectName()), "exec")
+            self._cache = (command, code, mtime)
+
+        return self._cache
+
     def _wrap_filepath(self, file_path):
         """Create a wrapped string for the python command
 
@@ -201,8 +296,6 @@ module.{module_name}()"""
             str: the wrapped command
         """
 
-        dirname = os.path.dirname(r"{}".format(file_path))
-        dirpath = dirname.replace("\\", "/")
-        module_name = os.path.splitext(os.path.basename(file_path))[0]
+        filepath = file_path.replace("\\", "/")
 
-        return self._COMMAND.format(module_name=module_name, dirname=dirpath)
+        return self._COMMAND.format(filepath=filepath)
@@ -0,0 +1,84 @@
+import logging
+
+from .vendor.Qt import QtCore
+from . import model
+
+log = logging.getLogger(__name__)
+
+
+class Worker(QtCore.QThread):
+    """Run a function on a worker thread and emit its result
+
+    The function must not create or touch any widgets, only the main
+    thread is allowed to.
+
+    """
+
+    succeeded = QtCore.Signal(object)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, function, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self._function = function
+
+    def run(self):
+        try:
+            result = self._function()
+        except Exception as e:
+            log.exception("Worker failed")
+            self.failed.emit(str(e))
+            return
+
+        self.succeeded.emit(result)
+
+
+class BuildQueue(object):
+    """Hand out the items of a model depth first in small batches
+
+    Consecutive actions of the same parent are handed out together so
+    they can be added in one go, all other items one at a time. The items
+    of a submenu are only handed out once the submenu is pushed.
+
+    """
+
+    def __init__(self, parent, items):
+
+        self.total = sum(model.count_items(item) for item in items)
+        self.done = 0
+
+        # Parents with their items and the position of the next item
+        self._stack = [[parent, items, 0]]
+
+    def push(self, parent, items):
+        """Hand out the items of a submenu before the rest of its parent"""
+        if items:
+            self._stack.append([parent, items, 0])
+
+    def next_batch(self, size):
+        """Return the next items of a parent
+
+        Args:
+            size (int): maximum number of actions to return
+
+        Returns:
+            tuple: the parent and its items, None when all are handed out
+
+        """
+
+        while self._stack:
+            entry = self._stack[-1]
+            parent, items, position = entry
+            if position >= len(items):
+                self._stack.pop()
+                continue
+
+            end = position + 1
+            if items[position].type == "action":
+                limit = min(len(items), position + size)
+                while end < limit and items[end].type == "action":
+                    end += 1
+
+            entry[2] = end
+            return parent, items[position:end]
+
+        return None
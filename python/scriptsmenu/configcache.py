@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import marshal
+import hashlib
+import logging
+
+from . import layers, version
+
+log = logging.getLogger(__name__)
+
+# The keyword arguments of ScriptsMenu.add_script which can be configured
+ACTION_KEYS = ("title", "command", "sourcetype", "icon",
+               "tags", "label", "tooltip", "execution")
+
+_ENV_VARIABLE = re.compile(r"\$(\w+)|\$\{([^}]*)\}|%(\w+)%")
+
+
+def get_cache_dir():
+    """Return the folder in which compiled configurations are stored
+
+    The folder can be set with the `SCRIPTSMENU_CACHE` environment variable.
+
+    Returns:
+        str
+
+    """
+    default = os.path.join(os.path.expanduser("~"), ".cache", "scriptsmenu")
+    return os.environ.get("SCRIPTSMENU_CACHE", default)
+
+
+def load(path, cache_dir=None):
+    """Load a configuration file through the compiled configuration cache
+
+    The compiled configuration is used when the size and modification time
+    of the file, the package version and the environment variables it uses
+    did not change. When only the modification time changed the contents
+    are compared by hash. Otherwise the JSON is parsed and compiled again.
+
+    A configuration which can not be compiled is returned as parsed from
+    the JSON file.
+
+    Args:
+        path (str): file path of the .json file
+        cache_dir (str, optional): folder to store the compiled configuration
+
+    Returns:
+        list
+
+    """
+
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cache_path = _get_cache_path(path, cache_dir or get_cache_dir())
+
+    header, configuration = read_cache(cache_path)
+    if header is not None and is_valid(header):
+        if (header["mtime"], header["size"]) == (stat.st_mtime, stat.st_size):
+            return configuration
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+
+    if header is None or not is_valid(header) or header["hash"] != digest:
+        configuration = json.loads(data.decode("utf-8"))
+        try:
+            configuration, variables = compile_configuration(configuration)
+        except ValueError as e:
+            log.warning("Configuration can't be compiled: {}".format(e))
+            return configuration
+
+        header = {"version": version.version,
+                  "hash": digest,
+                  "environment": get_environment(variables)}
+
+    header["mtime"] = stat.st_mtime
+    header["size"] = stat.st_size
+    write_cache(cache_path, header, configuration)
+
+    return configuration
+
+
+def load_layers(paths, cache_dir=None):
+    """Load and merge configuration files through a cache of the result
+
+    The merged and compiled configuration is stored per stack of layers
+    together with the fingerprint of each layer, its path, size and
+    modification time. As long as no layer changed, the package version is
+    the same and the environment variables the layers use did not change,
+    the cached result is returned without reading any of the layers.
+
+    Args:
+        paths (list): file paths of the .json files, lowest layer first
+        cache_dir (str, optional): folder to store the merged configuration
+
+    Returns:
+        list
+
+    """
+
+    paths = [os.path.abspath(path) for path in paths]
+    fingerprints = [get_fingerprint(path) for path in paths]
+    cache_path = _get_layers_cache_path(paths, cache_dir or get_cache_dir())
+
+    header, configuration = read_cache(cache_path)
+    if (header is not None and is_valid(header) and
+            header.get("layers") == fingerprints):
+        return configuration
+
+    configurations = []
+    for path in paths:
+        with open(path, "rb") as f:
+            configurations.append(json.loads(f.read().decode("utf-8")))
+
+    configuration = layers.merge(configurations)
+    try:
+        configuration, variables = compile_configuration(configuration)
+    except ValueError as e:
+        log.warning("Configuration can't be compiled: {}".format(e))
+        return configuration
+
+    header = {"version": version.version,
+              "layers": fingerprints,
+              "environment": get_environment(variables)}
+    write_cache(cache_path, header, configuration)
+
+    return configuration
+
+
+def compile_configuration(configuration):
+    """Return a validated copy of a configuration with paths expanded
+
+    Items without a type are dropped, the icons and the commands of `file`
+    actions have their environment variables expanded.
+
+    Args:
+        configuration (list): A ScriptsMenu configuration list
+
+    Returns:
+        tuple: the compiled configuration and the names of all
+            environment variables it depends on
+
+    Raises:
+        ValueError: when an item can not be built
+
+    """
+
+    variables = set()
+    compiled = _compile_items(configuration, variables)
+
+    return compiled, variables
+
+
+def _compile_items(items, variables):
+    """Compile a list of configuration items"""
+
+    if not isinstance(items, list):
+        raise ValueError("Expected a list of items, got: {}".format(items))
+
+    compiled = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("Configuration item is not a dict: "
+                             "{}".format(item))
+
+        item_type = item.get("type", None)
+        if item_type == "separator":
+            compiled.append({"type": "separator"})
+
+        elif item_type == "menu":
+            if "title" not in item or "items" not in item:
+                raise ValueError("Menu is missing 'title' or 'items' key")
+            compiled.append({"type": "menu",
+                             "title": item["title"],
+                             "items": _compile_items(item["items"],
+                                                     variables)})
+
+        elif item_type == "action":
+            compiled.append(_compile_action(item, variables))
+
+    return compiled
+
+
+def _compile_action(item, variables):
+    """Compile a single action item"""
+
+    action = {key: value for key, value in item.items() if key != "type"}
+
+    unknown = set(action) - set(ACTION_KEYS)
+    if unknown:
+        raise ValueError("Unknown keys for action "
+                         "'{}': {}".format(action.get("title"),
+                                           ", ".join(sorted(unknown))))
+
+    for key in ("title", "command", "sourcetype"):
+        if key not in action:
+            raise ValueError("Action is missing '{}' key".format(key))
+
+    tags = action.get("tags")
+    if tags is not None:
+        if not isinstance(tags, (list, tuple)):
+            raise ValueError("Invalid tags for action "
+                             "'{}'".format(action["title"]))
+        action["tags"] = list(tags)
+
+    icon = action.get("icon")
+    if icon:
+        action["icon"] = _expand(icon, variables)
+
+    command = action["command"]
+    if action["sourcetype"] == "file" and not os.path.isabs(command):
+        action["command"] = os.path.normpath(_expand(command, variables))
+
+    action["type"] = "action"
+
+    return action
+
+
+def _expand(path, variables):
+    """Expand the environment variables in a path and remember their names"""
+    variables.update(find_variables(path))
+    return os.path.expandvars(path)
+
+
+def find_variables(text):
+    """Return the names of the environment variables used in a text
+
+    Returns:
+        set
+
+    """
+    return set(next(name for name in match.groups() if name)
+               for match in _ENV_VARIABLE.finditer(text))
+
+
+def get_environment(variables):
+    """Return the values of environment variables by their names"""
+    return {name: os.environ.get(name) for name in sorted(variables)}
+
+
+def is_valid(header):
+    """Check whether a cache header matches the package and environment"""
+    if header.get("version") != version.version:
+        return False
+
+    environment = header.get("environment", {})
+    return environment == get_environment(environment)
+
+
+def _get_cache_path(path, cache_dir):
+    key = hashlib.sha1(os.path.normcase(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "{}.config".format(key))
+
+
+def get_fingerprint(path):
+    """Return the path, modification time and size of a file"""
+    stat = os.stat(path)
+    return [path, stat.st_mtime, stat.st_size]
+
+
+def _get_layers_cache_path(paths, cache_dir):
+    key = "\n".join(os.path.normcase(path) for path in paths)
+    key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "{}.layers".format(key))
+
+
+def read_cache(cache_path):
+    """Return the header and contents of a cache file, if any"""
+    try:
+        with open(cache_path, "rb") as f:
+            header, configuration = marshal.loads(f.read())
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None, None
+
+    if not isinstance(header, dict):
+        return None, None
+
+    return header, configuration
+
+
+def write_cache(cache_path, header, configuration):
+    """Write the cache file, failing silently on read-only locations"""
+    temp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(cache_path)):
+            os.makedirs(os.path.dirname(cache_path))
+        with open(temp_path, "wb") as f:
+            f.write(marshal.dumps((header, configuration)))
+        os.replace(temp_path, cache_path)
+    except (IOError, OSError) as e:
+        log.debug("Could not write configuration cache: {}".format(e))
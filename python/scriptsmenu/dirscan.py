@@ -0,0 +1,266 @@
+import os
+import re
+import json
+import hashlib
+import logging
+
+from . import configcache, layers, version
+
+log = logging.getLogger(__name__)
+
+# The module docstring of a script, after any comments or blank lines
+_DOCSTRING = re.compile(r"\A(?:[ \t]*(?:#[^\n]*)?\n)*[ \t]*[rRuU]?"
+                        r"(\"\"\"|''')(.*?)\1", re.S)
+
+# Lines in a docstring which set a key of the action, e.g. `Tags: a, b`
+_FIELD = re.compile(r"^[ \t]*(title|tags|label|icon|tooltip|execution)"
+                    r"[ \t]*:[ \t]*(.*?)[ \t]*$", re.I | re.M)
+
+# Bytes read from the start of a script to find its docstring
+_HEADER_SIZE = 8192
+
+
+class DirectoryScanner(object):
+    """Generate a configuration from folders of scripts
+
+    Every folder becomes a menu and every script an action of the `file`
+    source type, titled after its file name. The folders below the root
+    are added as tags. More keys are read from the module docstring of a
+    script, of which the first line is the tooltip and lines like
+    `Tags: rigging, joints` or `Label: JNT` set the other keys, and from a
+    sidecar `.json` file with the same name as the script.
+
+    The contents of each folder are stored in an index by the folder's
+    modification time, which is also saved to the cache folder. A scan only
+    reads the folders which changed since the index was made and stats the
+    others. Editing a script or sidecar in place does not change the
+    modification time of its folder, use `full` to read everything again.
+
+    """
+
+    def __init__(self, roots, extensions=(".py",), cache=True,
+                 cache_dir=None):
+        """Initialize the scanner and load the saved index
+
+        Args:
+            roots (list): the folders to scan, when they hold menus with
+                          the same name their contents are merged
+
+            extensions (tuple): the file extensions of scripts
+
+            cache (bool): save the index to disk and load it from there
+
+            cache_dir (str, optional): folder to save the index in
+
+        """
+
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.extensions = tuple(extensions)
+
+        # Folder path with its modification time, subfolders and actions
+        self._index = dict()
+        self._cache_path = None
+
+        # Number of folders which were read by the last scan
+        self.visited = 0
+
+        if cache:
+            key = "\n".join([version.version] + list(self.extensions) +
+                            [os.path.normcase(root) for root in self.roots])
+            key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+            self._cache_path = os.path.join(
+                cache_dir or configcache.get_cache_dir(),
+                "{}.scan".format(key))
+
+            header, index = configcache.read_cache(self._cache_path)
+            if header is not None and isinstance(index, dict) and \
+                    header.get("version") == version.version:
+                self._index = index
+
+    def scan(self, full=False):
+        """Return the configuration of the scripts below the roots
+
+        The actions are shared with the index to keep scanning an unchanged
+        tree fast, copy the configuration before changing it.
+
+        Args:
+            full (bool): read all folders instead of only the changed ones
+
+        Returns:
+            list: A ScriptsMenu configuration list
+
+        """
+
+        index = dict()
+        self.visited = 0
+
+        configurations = []
+        for root in self.roots:
+            configurations.append(self._scan_folder(root, (), index, full))
+
+        changed = self.visited or len(index) != len(self._index)
+        self._index = index
+        if changed and self._cache_path is not None:
+            header = {"version": version.version}
+            configcache.write_cache(self._cache_path, header, index)
+
+        if len(configurations) == 1:
+            return configurations[0]
+        return layers.merge(configurations)
+
+    def _scan_folder(self, path, folders, index, full):
+        """Return the configuration items of a folder and its subfolders"""
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return []
+
+        entry = self._index.get(path)
+        if full or entry is None or entry[0] != mtime:
+            entry = self._read_folder(path, mtime, folders)
+            self.visited += 1
+        index[path] = entry
+
+        items = []
+        for name in entry[1]:
+            children = self._scan_folder(os.path.join(path, name),
+                                         folders + (name,), index, full)
+            if children:
+                items.append({"type": "menu",
+                              "title": name,
+                              "items": children})
+        items.extend(entry[2])
+
+        return items
+
+    def _read_folder(self, path, mtime, folders):
+        """Return the index entry of a folder by reading its contents"""
+
+        subfolders = []
+        scripts = []
+        sidecars = set()
+        for dir_entry in os.scandir(path):
+            name = dir_entry.name
+            if name.startswith((".", "_")):
+                continue
+
+            if dir_entry.is_dir():
+                subfolders.append(name)
+            elif name.endswith(".json"):
+                sidecars.add(name)
+            elif name.endswith(self.extensions):
+                scripts.append(name)
+
+        tags = [folder.lower() for folder in folders]
+        actions = []
+        for name in sorted(scripts):
+            sidecar = os.path.splitext(name)[0] + ".json"
+            actions.append(_read_script(
+                os.path.join(path, name), tags,
+                os.path.join(path, sidecar) if sidecar in sidecars else None))
+
+        return [mtime, sorted(subfolders), actions]
+
+
+def scan(roots, extensions=(".py",), cache=True, cache_dir=None):
+    """Return the configuration of the scripts below the roots
+
+    See `DirectoryScanner` for how the scripts are found and described.
+
+    Args:
+        roots (list): the folders to scan
+
+        extensions (tuple): the file extensions of scripts
+
+        cache (bool): save the index of the folders in the cache folder
+
+        cache_dir (str, optional): folder to save the index in
+
+    Returns:
+        list: A ScriptsMenu configuration list
+
+    """
+    scanner = DirectoryScanner(roots, extensions=extensions, cache=cache,
+                               cache_dir=cache_dir)
+    return scanner.scan()
+
+
+def _read_script(path, tags, sidecar=None):
+    """Return the action of a script with the keys of its metadata"""
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    words = name.replace("-", " ").replace("_", " ").split()
+    action = {"type": "action",
+              "title": " ".join(word[:1].upper() + word[1:]
+                                for word in words),
+              "command": path,
+              "sourcetype": "file"}
+
+    metadata = _read_docstring(path)
+    if sidecar is not None:
+        try:
+            with open(sidecar, "r") as f:
+                metadata.update(_check_sidecar(json.load(f)))
+        except (IOError, OSError, ValueError) as e:
+            log.warning("Can't read metadata '{}': {}".format(sidecar, e))
+
+    extra = metadata.pop("tags", None) or []
+    action.update((key, value) for key, value in metadata.items()
+                  if key in configcache.ACTION_KEYS)
+    if tags or extra:
+        action["tags"] = list(tags) + [tag for tag in extra
+                                       if tag not in tags]
+
+    return action
+
+
+def _check_sidecar(data):
+    """Return the keys of a metadata file when they can be used
+
+    Raises:
+        ValueError: the file does not hold an object or its tags are not a
+                    list of strings
+
+    """
+    if not isinstance(data, dict):
+        raise ValueError("expected an object, got {}".format(
+            type(data).__name__))
+
+    tags = data.get("tags")
+    if tags is not None and not (isinstance(tags, list) and
+                                 all(isinstance(tag, str) for tag in tags)):
+        raise ValueError("tags must be a list of strings")
+
+    return data
+
+
+def _read_docstring(path):
+    """Return the keys set by the docstring of a script"""
+
+    try:
+        with open(path, "r", errors="replace") as f:
+            header = f.read(_HEADER_SIZE)
+    except (IOError, OSError):
+        return dict()
+
+    match = _DOCSTRING.match(header)
+    if match is None:
+        return dict()
+
+    docstring = match.group(2)
+    metadata = dict()
+    for key, value in _FIELD.findall(docstring):
+        key = key.lower()
+        if key == "tags":
+            metadata[key] = [tag.strip() for tag in value.split(",")
+                             if tag.strip()]
+        else:
+            metadata[key] = value
+
+    if "tooltip" not in metadata:
+        lines = _FIELD.sub("", docstring).strip().splitlines()
+        if lines:
+            metadata["tooltip"] = lines[0].strip()
+
+    return metadata
@@ -0,0 +1,234 @@
+import os
+import sys
+import logging
+import threading
+import subprocess
+import traceback
+from collections import deque
+
+from .vendor.Qt import QtCore
+from . import loader
+
+log = logging.getLogger(__name__)
+
+# Runs a `file` script in a `process` like on the GUI thread or a thread,
+# the loader is imported from its file so the process needs no Qt
+_BOOTSTRAP = """\
+import sys
+import importlib.util
+
+spec = importlib.util.spec_from_file_location("scriptsmenu_loader",
+                                              sys.argv[1])
+loader = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(loader)
+
+result = loader.run_script(sys.argv[2])
+if result is not None:
+    print(result)
+"""
+
+
+def get_python():
+    """Return the Python executable running `process` scripts
+
+    The executable can be set with the `SCRIPTSMENU_PYTHON` environment
+    variable, e.g. to `mayapy` as the host's executable is no interpreter.
+
+    Returns:
+        str
+
+    """
+    return os.environ.get("SCRIPTSMENU_PYTHON") or sys.executable
+
+
+class Job(object):
+    """A command running outside of the GUI thread
+
+    Once done `result` holds the value returned by the command: the return
+    value of the function of a `file` script, the `result` variable set by a
+    `python` command or the output of a `process`, which prints the
+    return value of the function of a `file` script. `error` holds the
+    traceback or error output when the command failed.
+
+    """
+
+    def __init__(self, title, mode, sourcetype, command, code=None):
+
+        self.title = title
+        self.mode = mode
+        self.sourcetype = sourcetype
+        self.command = command
+        self.code = code
+
+        self.state = "queued"
+        self.result = None
+        self.error = None
+
+        self._cancelled = False
+        self._process = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        """Cancel the job
+
+        Queued jobs do not start. A running process is terminated, a running
+        thread can not be stopped but its result is dropped.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._cancelled = True
+            process = self._process
+
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def run(self):
+        """Run the command, this is called on a worker thread"""
+        if self.mode == "process":
+            return self._run_process()
+
+        if self.sourcetype == "file":
+            return loader.run_script(self.command)
+
+        namespace = {"__name__": "__main__"}
+        exec(self.code, namespace)
+        return namespace.get("result")
+
+    def _run_process(self):
+        """Run the command in a separate Python process"""
+
+        if self.sourcetype == "file":
+            args = [get_python(), "-c", _BOOTSTRAP, loader.__file__,
+                    self.command]
+        else:
+            args = [get_python(), "-c", self.command]
+
+        with self._lock:
+            if self._cancelled:
+                return None
+            self._process = subprocess.Popen(args, stdout=subprocess.PIPE,
+                                             stderr=subprocess.PIPE,
+                                             universal_newlines=True)
+
+        output, errors = self._process.communicate()
+        if self._process.returncode != 0 and not self._cancelled:
+            raise RuntimeError(errors.strip() or "Process exited with "
+                               "code {}".format(self._process.returncode))
+
+        return output
+
+
+class JobRunner(QtCore.QObject):
+    """Run jobs on worker threads with a limit on concurrent jobs
+
+    Jobs beyond `max_jobs` wait in a queue. The signals are emitted on the
+    thread of the runner, which is the GUI thread.
+
+    """
+
+    started = QtCore.Signal(object)
+    finished = QtCore.Signal(object)
+    failed = QtCore.Signal(object)
+    cancelled = QtCore.Signal(object)
+
+    _done = QtCore.Signal(object)
+
+    def __init__(self, parent=None, max_jobs=4):
+        QtCore.QObject.__init__(self, parent)
+
+        self.max_jobs = max_jobs
+
+        self._queue = deque()
+        self._running = set()
+
+        self._done.connect(self._on_done)
+
+    def submit(self, job):
+        """Run a job once fewer than `max_jobs` jobs are running
+
+        Args:
+            job (Job): the job to run
+
+        Returns:
+            Job
+
+        """
+        self._queue.append(job)
+        self._start_next()
+        return job
+
+    def set_max_jobs(self, count):
+        """Set the number of jobs which can run at once
+
+        Args:
+            count (int): the maximum number of running jobs
+
+        Returns:
+            None
+
+        """
+        self.max_jobs = count
+        self._start_next()
+
+    def jobs(self):
+        """Return the running and queued jobs
+
+        Returns:
+            list
+
+        """
+        return list(self._running) + list(self._queue)
+
+    def cancel_all(self):
+        """Cancel all running and queued jobs"""
+        for job in self.jobs():
+            job.cancel()
+        self._start_next()
+
+    def _start_next(self):
+        """Start queued jobs while there is room"""
+        while self._queue and len(self._running) < self.max_jobs:
+            job = self._queue.popleft()
+            if job.cancelled:
+                job.state = "cancelled"
+                self.cancelled.emit(job)
+                continue
+
+            job.state = "running"
+            self._running.add(job)
+            thread = threading.Thread(target=self._run, args=(job,),
+                                      name="scriptsmenu: " + str(job.title))
+            thread.daemon = True
+            thread.start()
+            self.started.emit(job)
+
+    def _run(self, job):
+        """Run a job, this is called on a worker thread"""
+        try:
+            job.result = job.run()
+        except Exception:
+            job.error = traceback.format_exc()
+        self._done.emit(job)
+
+    def _on_done(self, job):
+        self._running.discard(job)
+
+        if job.cancelled:
+            job.state = "cancelled"
+            self.cancelled.emit(job)
+        elif job.error is not None:
+            job.state = "failed"
+            log.error("Script '{}' failed:\n{}".format(job.title, job.error))
+            self.failed.emit(job)
+        else:
+            job.state = "finished"
+            self.finished.emit(job)
+
+        self._start_next()
@@ -0,0 +1,76 @@
+import os
+from collections import OrderedDict
+
+from .vendor.Qt import QtGui
+
+
+class IconCache(object):
+    """Least recently used cache of icons shared by all script actions
+
+    Icons are stored by their resolved file path. Paths which are empty or
+    do not exist are stored as `None` so the disk is not checked again.
+
+    """
+
+    def __init__(self, max_size=512):
+
+        self._icons = OrderedDict()
+        self._max_size = max_size
+
+    def __len__(self):
+        return len(self._icons)
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        """Set the maximum number of icons to keep
+
+        Args:
+            value (int): the maximum number of cached paths
+
+        Returns:
+            None
+
+        """
+        self._max_size = value
+        self._evict()
+
+    def get(self, path):
+        """Return the icon for a resolved file path
+
+        Args:
+            path (str): the file path of the image
+
+        Returns:
+            QtGui.QIcon or None: None when the path is empty or missing
+
+        """
+
+        try:
+            icon = self._icons.pop(path)
+        except KeyError:
+            if path and os.path.isfile(path):
+                icon = QtGui.QIcon(path)
+            else:
+                icon = None
+
+        # Mark as most recently used
+        self._icons[path] = icon
+        self._evict()
+
+        return icon
+
+    def clear(self):
+        """Remove all cached icons"""
+        self._icons.clear()
+
+    def _evict(self):
+        """Drop the least recently used icons above the maximum size"""
+        while len(self._icons) > self._max_size:
+            self._icons.popitem(last=False)
+
+
+icon_cache = IconCache()
@@ -4,6 +4,8 @@ from vendor.Qt import QtWidgets
 
 # Import local modules
 import scriptsmenu
+from scriptsmenu import snapshot
+from scriptsmenu.profiling import profiler
 
 
 def _mari_main_window():
@@ -34,21 +36,30 @@ def _mari_main_menubar():
     return menubar[0]
 
 
-def main(title="Scripts"):
+def main(title="Scripts", configuration=None, lazy=False):
     """Build the main scripts menu in Mari.
 
     Args:
         title (str): Name of the menu in the application.
+        configuration (str, list): Configuration file or list of layers to
+            build a new menu from, restored from a snapshot when unchanged.
+        lazy (bool): Only create the submenus of the configuration, their
+            items are created when a submenu is shown for the first time.
 
     Returns:
         scriptsmenu.ScriptsMenu:  Instance object.
 
     """
-    mari_main_bar = _mari_main_menubar()
-    for mari_bar in mari_main_bar.children():
-        if isinstance(mari_bar, scriptsmenu.ScriptsMenu):
-            if mari_bar.title() == title:
-                menu = mari_bar
-                return menu
-    menu = scriptsmenu.ScriptsMenu(title=title, parent=mari_main_bar)
+    with profiler.report("launchformari.main"):
+        with profiler.phase("find_menubar"):
+            mari_main_bar = _mari_main_menubar()
+        for mari_bar in mari_main_bar.children():
+            if isinstance(mari_bar, scriptsmenu.ScriptsMenu):
+                if mari_bar.title() == title:
+                    menu = mari_bar
+                    return menu
+        with profiler.phase("create_menus"):
+            menu = scriptsmenu.ScriptsMenu(title=title, parent=mari_main_bar)
+        if configuration:
+            snapshot.build_menu(menu, configuration, lazy=lazy)
     return menu
@@ -5,6 +5,8 @@ import maya.mel as mel
 
 import scriptsmenu
 from .vendor.Qt import QtCore, QtWidgets
+from . import snapshot
+from .profiling import profiler
 
 log = logging.getLogger(__name__)
 
@@ -19,7 +21,7 @@ def register_repeat_last(action):
         int: 0
 
     """
-    command = action.process_command()
+    command = action.processed_command()
     command = command.replace("\n", "; ")
     # Register command to Maya (mel)
     cmds.repeatLast(addCommand='python("{}")'.format(command),
@@ -43,7 +45,7 @@ def to_shelf(action):
                                           query=True,
                                           selectTab=True)
 
-    cmds.shelfButton(command=action.process_command(),
+    cmds.shelfButton(command=action.processed_command(),
                      sourceType="python",
                      parent=current_active_shelf,
                      image=action.iconfile or "pythonFamily.png",
@@ -99,7 +101,8 @@ def find_scripts_menu(title, parent):
     return menu
 
 
-def main(title="Scripts", parent=None, objectName=None):
+def main(title="Scripts", parent=None, objectName=None, configuration=None,
+         lazy=False):
     """Build the main scripts menu in Maya
 
     Args:
@@ -109,24 +112,38 @@ def main(title="Scripts", parent=None, objectName=None):
 
         objectName (str): custom objectName for scripts menu
 
+        configuration (str, list): configuration file or list of layers to
+            build a new menu from, restored from a snapshot when unchanged
+
+        lazy (bool): only create the submenus of the configuration, their
+            items are created when a submenu is shown for the first time
+
     Returns:
         scriptsmenu.ScriptsMenu instance
 
     """
 
-    mayamainbar = parent or _maya_main_menubar()
-    try:
-        # check menu already exists
-        menu = find_scripts_menu(title, mayamainbar)
-        if not menu:
-            log.info("Attempting to build menu ...")
-            object_name = objectName or title.lower()
-            menu = scriptsmenu.ScriptsMenu(title=title,
-                                           parent=mayamainbar,
-                                           objectName=object_name)
-    except Exception as e:
-        log.error(e)
-        return
+    with profiler.report("launchformaya.main"):
+        with profiler.phase("find_menubar"):
+            mayamainbar = parent or _maya_main_menubar()
+        try:
+            # check menu already exists
+            menu = find_scripts_menu(title, mayamainbar)
+            created = not menu
+            if created:
+                log.info("Attempting to build menu ...")
+                object_name = objectName or title.lower()
+                with profiler.phase("create_menus"):
+                    menu = scriptsmenu.ScriptsMenu(title=title,
+                                                   parent=mayamainbar,
+                                                   objectName=object_name)
+        except Exception as e:
+            log.error(e)
+            profiler.count("failures")
+            return
+
+        if created and configuration:
+            snapshot.build_menu(menu, configuration, lazy=lazy)
 
     # Register control + shift callback to add to shelf (maya behavior)
     modifiers = QtCore.Qt.ControlModifier | QtCore.Qt.ShiftModifier
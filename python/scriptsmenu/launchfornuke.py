@@ -1,5 +1,7 @@
 import scriptsmenu
 from .vendor.Qt import QtWidgets
+from . import snapshot
+from .profiling import profiler
 
 
 def _nuke_main_window():
@@ -21,13 +23,33 @@ def _nuke_main_menubar():
     return menubar[0]
 
 
-def main(title="Scripts"):
-    nuke_main_bar = _nuke_main_menubar()
-    for nuke_bar in nuke_main_bar.children():
-        if isinstance(nuke_bar, scriptsmenu.ScriptsMenu):
-            if nuke_bar.title() == title:
-                menu = nuke_bar
-                return menu
+def main(title="Scripts", configuration=None, lazy=False):
+    """Build the main scripts menu in Nuke
 
-    menu = scriptsmenu.ScriptsMenu(title=title, parent=nuke_main_bar)
+    Args:
+        title (str): name of the menu in the application
+
+        configuration (str, list): configuration file or list of layers to
+            build a new menu from, restored from a snapshot when unchanged
+
+        lazy (bool): only create the submenus of the configuration, their
+            items are created when a submenu is shown for the first time
+
+    Returns:
+        scriptsmenu.ScriptsMenu instance
+
+    """
+    with profiler.report("launchfornuke.main"):
+        with profiler.phase("find_menubar"):
+            nuke_main_bar = _nuke_main_menubar()
+        for nuke_bar in nuke_main_bar.children():
+            if isinstance(nuke_bar, scriptsmenu.ScriptsMenu):
+                if nuke_bar.title() == title:
+                    menu = nuke_bar
+                    return menu
+
+        with profiler.phase("create_menus"):
+            menu = scriptsmenu.ScriptsMenu(title=title, parent=nuke_main_bar)
+        if configuration:
+            snapshot.build_menu(menu, configuration, lazy=lazy)
     return menu
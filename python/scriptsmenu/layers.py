@@ -0,0 +1,99 @@
+def merge(configurations):
+    """Merge configuration layers into a single configuration
+
+    The layers are merged in order, e.g. studio, show and user. Items are
+    matched by their menu path, type and title:
+
+    * a menu which already exists gets the items of the later layer merged
+      into its items
+    * an action which already exists gets its keys overridden by the keys
+      of the later layer, e.g. only a different `icon`
+    * an item with `"remove": true` removes the matching item
+    * other items and all separators are added at the end of their menu
+
+    Items keep the position of the layer they first appeared in. When a
+    title occurs more than once in a menu, the first occurrence in a later
+    layer matches the first occurrence in the merged menu and so on.
+
+    Args:
+        configurations (list): ScriptsMenu configuration lists
+
+    Returns:
+        list: the merged configuration, the layers are not modified
+
+    """
+
+    merged = []
+    for configuration in configurations:
+        _merge_items(merged, configuration)
+    return merged
+
+
+def _merge_items(merged, items):
+    """Merge the items of a layer into the items of a merged menu"""
+
+    if not isinstance(items, list):
+        raise ValueError("Expected a list of items, got: {}".format(items))
+
+    positions = dict()
+    for index, item in enumerate(merged):
+        key = _get_key(item, positions)
+        if key is not None:
+            positions[key] = index
+
+    matched = dict()
+    for item in items:
+        key = _get_key(item, matched)
+        if key is None:
+            if not item.get("remove"):
+                merged.append(dict(item))
+            continue
+        index = matched[key] = positions.get(key)
+
+        if item.get("remove"):
+            if index is not None:
+                merged[index] = None
+            continue
+
+        if index is None:
+            # New item, merged into an empty menu to drop removals
+            merged.append(_copy(item))
+            positions[key] = len(merged) - 1
+
+        elif item["type"] == "menu":
+            _merge_items(merged[index]["items"], item.get("items", []))
+
+        else:
+            merged[index] = dict(merged[index], **_copy(item))
+
+    merged[:] = [item for item in merged if item is not None]
+
+
+def _get_key(item, keys):
+    """Return the identity of an item within its menu, None for separators
+
+    Items are identified by their type and title, numbered to tell apart
+    the same title occurring more than once.
+
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Configuration item is not a dict: {}".format(item))
+
+    item_type = item.get("type")
+    if item_type not in ("menu", "action"):
+        return None
+
+    key = (item_type, item.get("title"))
+    count = 0
+    while key + (count,) in keys:
+        count += 1
+    return key + (count,)
+
+
+def _copy(item):
+    """Return a copy of an item without the keys used for merging"""
+    copy = {key: value for key, value in item.items() if key != "remove"}
+    if copy.get("type") == "menu":
+        copy["items"] = []
+        _merge_items(copy["items"], item.get("items", []))
+    return copy
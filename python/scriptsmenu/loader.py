@@ -0,0 +1,190 @@
+import os
+import sys
+import threading
+import importlib.util
+
+
+class ScriptLoader(object):
+    """Load the scripts of `file` actions and keep them loaded
+
+    Scripts are cached by their absolute path and only loaded again when
+    the modification time or size of the file changes. Compiled code is
+    read from and written to `__pycache__` like for regular imports.
+    Scripts can be loaded from several threads at once and compiled ahead
+    of time with `compile`, so loading them later only runs their code. The
+    code of a script runs under a lock of its own path only, a slow script
+    loading in the background does not block loading other scripts.
+
+    """
+
+    def __init__(self):
+
+        self._scripts = dict()
+        self._compiled = dict()
+        self._path_locks = dict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path):
+        """Return the module of a script, loading it when it changed
+
+        Args:
+            path (str): the file path of the script
+
+        Returns:
+            tuple: the module, its code and whether it was loaded just now
+
+        """
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime, stat.st_size)
+
+        with self._lock:
+            cached = self._scripts.get(path)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1], cached[2], False
+
+            path_lock = self._path_locks.get(path)
+            if path_lock is None:
+                path_lock = self._path_locks[path] = threading.RLock()
+
+        with path_lock:
+            with self._lock:
+                # Loaded by another thread while waiting for the path
+                cached = self._scripts.get(path)
+                if cached is not None and cached[0] == signature:
+                    self.hits += 1
+                    return cached[1], cached[2], False
+
+                self.misses += 1
+                compiled = self._compiled.pop(path, None)
+
+            module_name = os.path.splitext(os.path.basename(path))[0]
+            spec = importlib.util.spec_from_file_location(module_name, path)
+
+            if compiled is not None and compiled[0] == signature:
+                code = compiled[1]
+            else:
+                code = spec.loader.get_code(module_name)
+
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            exec(code, module.__dict__)
+
+            with self._lock:
+                self._scripts[path] = (signature, module, code)
+
+        return module, code, True
+
+    def compile(self, path):
+        """Read and compile a script without running it
+
+        The code is kept until the script is loaded, the file is read
+        outside of the lock so several scripts can be compiled at once.
+
+        Args:
+            path (str): the file path of the script
+
+        Returns:
+            code: the compiled script
+
+        Raises:
+            OSError: when the script can't be read
+            SyntaxError: when the script can't be compiled
+
+        """
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime, stat.st_size)
+
+        with self._lock:
+            cached = self._scripts.get(path) or self._compiled.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[-1]
+
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        code = spec.loader.get_code(module_name)
+
+        with self._lock:
+            self._compiled[path] = (signature, code)
+
+        return code
+
+    def run(self, path):
+        """Run a script
+
+        When the script defines a function with the same name as the file
+        that function is called, otherwise the script itself is run again.
+
+        Args:
+            path (str): the file path of the script
+
+        Returns:
+            object: the return value of the function, None without one
+
+        """
+
+        module, code, loaded = self.load(path)
+
+        function = getattr(module, module.__name__, None)
+        if callable(function):
+            return function()
+        elif not loaded:
+            exec(code, module.__dict__)
+
+    def stats(self):
+        """Return the cache hits, misses and the number of cached scripts
+        and scripts compiled ahead of time
+
+        Returns:
+            dict
+
+        """
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "scripts": len(self._scripts),
+                "compiled": len(self._compiled)}
+
+    def clear(self):
+        """Remove all cached scripts and reset the counters"""
+        with self._lock:
+            self._scripts.clear()
+            self._compiled.clear()
+            self._path_locks.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+default_loader = ScriptLoader()
+
+
+def run_script(path):
+    """Run a script with the shared loader of all `file` actions
+
+    Args:
+        path (str): the file path of the script
+
+    Returns:
+        object: the return value of the script's function
+
+    """
+    return default_loader.run(path)
+
+
+def compile_script(path):
+    """Compile a script ahead of time with the shared loader
+
+    Args:
+        path (str): the file path of the script
+
+    Returns:
+        code: the compiled script
+
+    """
+    return default_loader.compile(path)
@@ -0,0 +1,185 @@
+import sys
+from collections import defaultdict
+
+
+class MenuTree(object):
+    """Parent and child map of the menus and actions of a ScriptsMenu
+
+    Every menu keeps a count of its visible children. A menu is visible as
+    long as that count is above zero and it counts as one visible child of
+    its own parent. Changing the visibility of an action only walks up the
+    tree for as long as the visibility of the parent menus flips, so the
+    cost of a search depends on the changed actions, not the tree size.
+
+    Parents which were not added as a menu, like the root menu, end the
+    walk up the tree.
+
+    """
+
+    def __init__(self):
+
+        self._parents = dict()
+        self._children = defaultdict(dict)
+        self._visible_children = dict()
+        self._visible_actions = set()
+
+    def __contains__(self, node):
+        return node in self._parents
+
+    def add_menu(self, menu, parent):
+        """Add a menu to the tree
+
+        A new menu has no visible children and is therefore not visible.
+
+        Args:
+            menu (QtWidgets.QMenu): the menu to add
+            parent (QtWidgets.QMenu): the menu it is added to
+
+        Returns:
+            None
+
+        """
+        self._parents[menu] = parent
+        self._children[parent][menu] = None
+        self._visible_children[menu] = 0
+
+    def add_action(self, action, parent, visible=True):
+        """Add an action to the tree
+
+        Args:
+            action (QtWidgets.QAction): the action to add
+            parent (QtWidgets.QMenu): the menu it is added to
+            visible (bool): whether the action is visible
+
+        Returns:
+            set: the menus of which the visibility changed
+
+        """
+        self._parents[action] = parent
+        self._children[parent][action] = None
+
+        changed = set()
+        if visible:
+            self._visible_actions.add(action)
+            self._update_count(parent, 1, changed)
+
+        return changed
+
+    def set_action_visible(self, action, visible, changed=None):
+        """Propagate a change in visibility of an action to its menus
+
+        Args:
+            action (QtWidgets.QAction): the action which changed
+            visible (bool): the new visibility of the action
+            changed (set, optional): set to add the changed menus to
+
+        Returns:
+            set: the menus of which the visibility changed
+
+        """
+        if changed is None:
+            changed = set()
+
+        if visible == (action in self._visible_actions):
+            return changed
+
+        if visible:
+            self._visible_actions.add(action)
+        else:
+            self._visible_actions.discard(action)
+
+        delta = 1 if visible else -1
+        self._update_count(self._parents[action], delta, changed)
+
+        return changed
+
+    def remove(self, node):
+        """Remove a menu or action and everything below it from the tree
+
+        Args:
+            node (QtWidgets.QMenu, QtWidgets.QAction): the node to remove
+
+        Returns:
+            set: the menus of which the visibility changed
+
+        """
+
+        changed = set()
+        parent = self._parents[node]
+        if node in self._visible_children:
+            visible = self.is_visible(node)
+        else:
+            visible = node in self._visible_actions
+
+        self._forget(node)
+        del self._children[parent][node]
+        if visible:
+            self._update_count(parent, -1, changed)
+
+        return changed
+
+    def is_visible(self, menu):
+        """Return whether the menu has any visible children
+
+        Args:
+            menu (QtWidgets.QMenu): a menu in the tree
+
+        Returns:
+            bool
+
+        """
+        return self._visible_children.get(menu, 0) > 0
+
+    def parent(self, node):
+        """Return the parent menu of a menu or action"""
+        return self._parents.get(node)
+
+    def children(self, menu):
+        """Return the menus and actions added to a menu"""
+        return list(self._children.get(menu, {}))
+
+    def memory_footprint(self):
+        """Return the approximate memory used by the tree in bytes
+
+        Returns:
+            int
+
+        """
+        size = sum(sys.getsizeof(table) for table in
+                   (self._parents, self._children, self._visible_children,
+                    self._visible_actions))
+        size += sum(sys.getsizeof(children) for children in
+                    self._children.values())
+        return size
+
+    def clear(self):
+        """Remove all menus and actions from the tree"""
+        self._parents.clear()
+        self._children.clear()
+        self._visible_children.clear()
+        self._visible_actions.clear()
+
+    def _forget(self, node):
+        """Drop a node and its descendants without updating any counts"""
+        del self._parents[node]
+        self._visible_children.pop(node, None)
+        self._visible_actions.discard(node)
+        for child in self._children.pop(node, {}):
+            self._forget(child)
+
+    def _update_count(self, menu, delta, changed):
+        """Change the visible children count of a menu and its parents"""
+
+        while menu in self._visible_children:
+            count = self._visible_children[menu]
+            self._visible_children[menu] = count + delta
+
+            was_visible = count > 0
+            is_visible = count + delta > 0
+            if was_visible == is_visible:
+                break
+
+            # The menu itself flipped, which changes the count of its parent
+            changed.add(menu)
+            delta = 1 if is_visible else -1
+            menu = self._parents[menu]
@@ -0,0 +1,217 @@
+import os
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+# How the command of an action is run, `main` runs it on the GUI thread
+EXECUTION_MODES = ("main", "thread", "process")
+
+# The source types which can run outside of the GUI thread
+BACKGROUND_SOURCETYPES = ("python", "file")
+
+
+def resolve_filepath(command):
+    """Return the full path of the script of a `file` source command
+
+    Args:
+        command (str): the command of the action, a path which can contain
+                       environment variables
+
+    Returns:
+        str
+
+    """
+    if os.path.isabs(command):
+        return command
+
+    return os.path.normpath(os.path.expandvars(command))
+
+
+def intern_tags(tags):
+    """Return the tags as a tuple of interned strings
+
+    Args:
+        tags (list, tuple): the tags
+
+    Returns:
+        tuple
+
+    """
+    if not tags:
+        return tuple()
+    return tuple(map(sys.intern, map(str, tags)))
+
+
+class ScriptItem(object):
+    """A script which runs when its menu item is clicked
+
+    The records of the model use `__slots__` and interned tags so a whole
+    menu can be described, searched, compared and serialized without any
+    Qt objects. An `Action` is the widget showing a `ScriptItem`.
+
+    """
+
+    __slots__ = ("title", "command", "sourcetype", "icon", "tags", "label",
+                 "tooltip", "execution")
+
+    type = "action"
+
+    def __init__(self, title, command, sourcetype, icon=None, tags=None,
+                 label=None, tooltip=None, execution=None):
+
+        assert tags is None or isinstance(tags, (list, tuple))
+
+        self.title = title
+        self.command = command
+        self.sourcetype = sourcetype
+        self.icon = icon
+        self.tags = intern_tags(tags)
+        self.label = label
+        self.tooltip = tooltip
+        self.execution = execution
+
+    def search_tags(self):
+        """Return the tags to search for, including the lower case title"""
+        if not self.title:
+            return self.tags
+        return self.tags + (sys.intern(self.title.lower()),)
+
+    def values(self):
+        """Return all values of the item for comparison"""
+        return (self.title, self.command, self.sourcetype, self.icon,
+                self.tags, self.label, self.tooltip, self.execution)
+
+    def copy(self, **values):
+        """Return a copy of the item with the given values changed"""
+        data = dict((key, getattr(self, key)) for key in self.__slots__)
+        data.update(values)
+        return ScriptItem(**data)
+
+    def as_dict(self):
+        """Return the item as a configuration dictionary"""
+        data = {"type": self.type,
+                "title": self.title,
+                "command": self.command,
+                "sourcetype": self.sourcetype}
+        if self.tags:
+            data["tags"] = list(self.tags)
+        for key in ("icon", "label", "tooltip", "execution"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+
+class MenuItem(object):
+    """A submenu holding other items"""
+
+    __slots__ = ("title", "items")
+
+    type = "menu"
+    command = None
+
+    def __init__(self, title, items=None):
+
+        self.title = title
+        self.items = items if items is not None else []
+
+    def values(self):
+        """Return all values of the menu and its items for comparison"""
+        return (self.title, tuple(item.values() for item in self.items))
+
+    def as_dict(self):
+        """Return the menu as a configuration dictionary"""
+        return {"type": self.type,
+                "title": self.title,
+                "items": to_configuration(self.items)}
+
+
+class SeparatorItem(object):
+    """A separator line between items"""
+
+    __slots__ = ()
+
+    type = "separator"
+    title = None
+    command = None
+
+    def values(self):
+        return (self.type,)
+
+    def as_dict(self):
+        return {"type": self.type}
+
+
+def from_configuration(configuration):
+    """Return the records of a ScriptsMenu configuration list
+
+    Items without a type or with an unknown type are skipped.
+
+    Args:
+        configuration (list): A ScriptsMenu configuration list
+
+    Returns:
+        list
+
+    """
+
+    items = []
+    for item in configuration:
+        assert isinstance(item, dict), "Configuration is wrong!"
+
+        # skip items which have no `type` key
+        item_type = item.get("type", None)
+        if not item_type:
+            log.warning("Missing 'type' from configuration item")
+            continue
+
+        if item_type == "separator":
+            items.append(SeparatorItem())
+
+        elif item_type == "menu":
+            assert "items" in item, "Menu is missing 'items' key"
+            items.append(MenuItem(item["title"],
+                                  from_configuration(item["items"])))
+
+        elif item_type == "action":
+            # filter out `type` from the item dict
+            config = {key: value for key, value in
+                      item.items() if key != "type"}
+            missing = [key for key in ("title", "command", "sourcetype")
+                       if key not in config]
+            assert not missing, "Action '{}' is missing keys: {}".format(
+                config.get("title"), ", ".join(missing))
+            items.append(ScriptItem(**config))
+
+    return items
+
+
+def to_configuration(items):
+    """Return a ScriptsMenu configuration list of records
+
+    Args:
+        items (list): records of a menu
+
+    Returns:
+        list
+
+    """
+    return [item.as_dict() for item in items]
+
+
+def iter_scripts(items):
+    """Yield all scripts in a list of records and their submenus"""
+    for item in items:
+        if item.type == "action":
+            yield item
+        elif item.type == "menu":
+            for script in iter_scripts(item.items):
+                yield script
+
+
+def count_items(item):
+    """Return the number of items in a record, including itself"""
+    if item.type != "menu":
+        return 1
+    return 1 + sum(count_items(child) for child in item.items)
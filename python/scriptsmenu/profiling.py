@@ -0,0 +1,194 @@
+import time
+import logging
+import threading
+from collections import OrderedDict, deque, defaultdict
+
+log = logging.getLogger(__name__)
+
+
+class BuildReport(object):
+    """Timings and counts of a single build or update of a menu"""
+
+    def __init__(self, name):
+
+        self.name = name
+        self.duration = 0.0
+        self.phases = OrderedDict()
+        self.counts = defaultdict(int)
+
+    def add_time(self, phase, duration):
+        """Add the duration of one run of a phase
+
+        Args:
+            phase (str): name of the phase
+            duration (float): duration in seconds
+
+        Returns:
+            None
+
+        """
+        timing = self.phases.get(phase)
+        if timing is None:
+            timing = self.phases[phase] = {"time": 0.0, "calls": 0}
+        timing["time"] += duration
+        timing["calls"] += 1
+
+    def count(self, key, amount=1):
+        """Increase a counter, e.g. `actions`, `menus`, `icons`, `failures`"""
+        self.counts[key] += amount
+
+    def as_dict(self):
+        """Return the report as plain data
+
+        Returns:
+            dict
+
+        """
+        return {"name": self.name,
+                "duration": self.duration,
+                "phases": {phase: dict(timing) for phase, timing
+                           in self.phases.items()},
+                "counts": dict(self.counts)}
+
+    def __str__(self):
+        lines = ["{}: {:.3f}s".format(self.name, self.duration)]
+        for phase, timing in self.phases.items():
+            lines.append("  {:<24} {:>9.3f}s {:>8} calls".format(
+                phase, timing["time"], timing["calls"]))
+        for key, amount in sorted(self.counts.items()):
+            lines.append("  {:<24} {:>10}".format(key, amount))
+        return "\n".join(lines)
+
+
+class Profiler(object):
+    """Collect build reports of the scripts menu
+
+    Profiling is disabled by default. While disabled `report` and `phase`
+    return a shared context which does nothing. Each thread records its own
+    report.
+
+    """
+
+    def __init__(self, history=20):
+
+        self.enabled = False
+        self.reports = deque(maxlen=history)
+
+        self._local = threading.local()
+
+    @property
+    def _current(self):
+        return getattr(self._local, "report", None)
+
+    @_current.setter
+    def _current(self, report):
+        self._local.report = report
+
+    @property
+    def current(self):
+        """Return the report being recorded, None when not recording"""
+        return self._current
+
+    @property
+    def last_report(self):
+        """Return the last finished report, None when there is none"""
+        return self.reports[-1] if self.reports else None
+
+    def report(self, name):
+        """Return a context which records a report of the code it runs
+
+        Nested reports are recorded as part of the outer report.
+
+        Args:
+            name (str): name of the report, e.g. the function being profiled
+
+        Returns:
+            context manager
+
+        """
+        if not self.enabled or self._current is not None:
+            return _NULL_CONTEXT
+        return _ReportContext(self, name)
+
+    def phase(self, name):
+        """Return a context which times a phase of the current report
+
+        Args:
+            name (str): name of the phase
+
+        Returns:
+            context manager
+
+        """
+        if self._current is None:
+            return _NULL_CONTEXT
+        return _PhaseContext(self._current, name)
+
+    def count(self, key, amount=1):
+        """Increase a counter of the current report"""
+        if self._current is not None:
+            self._current.count(key, amount)
+
+    def clear(self):
+        """Remove all finished reports"""
+        self.reports.clear()
+
+
+class _NullContext(object):
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *args):
+        return False
+
+
+class _PhaseContext(object):
+
+    def __init__(self, report, name):
+        self._report = report
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self._report
+
+    def __exit__(self, *args):
+        self._report.add_time(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _ReportContext(object):
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._report = BuildReport(name)
+        self._start = None
+
+    def __enter__(self):
+        self._profiler._current = self._report
+        self._start = time.perf_counter()
+        return self._report
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        report = self._report
+        report.duration = time.perf_counter() - self._start
+        if exc_type is not None:
+            report.count("failures")
+
+        self._profiler._current = None
+        self._profiler.reports.append(report)
+        log.debug(str(report))
+
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+profiler = Profiler()
+
+
+def enable(state=True):
+    """Enable or disable recording build reports"""
+    profiler.enabled = state
@@ -1,18 +1,45 @@
 import os
+import sys
 import json
+import time
 import logging
-from collections import defaultdict
-
-from .vendor.Qt import QtWidgets, QtCore
-from . import action
+from itertools import groupby
+from functools import partial
+from collections import defaultdict, OrderedDict
+
+from .vendor.Qt import QtWidgets, QtCore, QtGui
+from . import (
+    action,
+    asyncbuild,
+    configcache,
+    executor,
+    iconcache,
+    layers,
+    menutree,
+    model,
+    profiling,
+    searchindex,
+    snapshot,
+    warmup,
+    watcher
+)
 
 log = logging.getLogger(__name__)
+profiler = profiling.profiler
 
 
 class ScriptsMenu(QtWidgets.QMenu):
     """A Qt menu that displays a list of searchable actions"""
 
     updated = QtCore.Signal(QtWidgets.QMenu)
+    build_progress = QtCore.Signal(int, int)
+    build_finished = QtCore.Signal()
+    build_failed = QtCore.Signal(str)
+    script_finished = QtCore.Signal(object)
+    script_failed = QtCore.Signal(object)
+    warmup_progress = QtCore.Signal(int, int)
+    warmup_failed = QtCore.Signal(str, str)
+    warmup_finished = QtCore.Signal()
 
     def __init__(self, *args, **kwargs):
         """Initialize Scripts menu
@@ -32,8 +59,57 @@ class ScriptsMenu(QtWidgets.QMenu):
         self.update_action = None
 
         self._script_actions = []
+        self._visible_actions = set()
+        self._search_index = searchindex.SearchIndex()
+        self._menu_tree = menutree.MenuTree()
+        self._incremental_search = None
+        self._ranked_index = None
+        self._ranked_limit = 20
+        self._result_actions = []
+        self._showing_results = False
+        self._pending_menus = dict()
+        self._placeholders = defaultdict(list)
+        self._pending_icons = dict()
+        self._configured = defaultdict(OrderedDict)
+
+        # The slots connected to aboutToShow of menus, disconnected once
+        # they are no longer needed
+        self._populate_slots = dict()
+        self._icon_slots = dict()
+
+        # Scripts with their search tags while restoring a snapshot
+        self._restoring = None
+
+        self._watcher = None
+        self._watched_configurations = []
         self._callbacks = defaultdict(list)
 
+        # Usage statistics with the boost of the scripts which were used
+        self._usage = None
+        self._boosts = dict()
+        self._prefetch = 0
+        self._prefetch_left = 0
+        self._prefetch_timer = QtCore.QTimer(self)
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(self._prefetch_next)
+
+        # Scripts running in the background
+        self._jobs = executor.JobRunner(self)
+        self._jobs.finished.connect(self.script_finished)
+        self._jobs.failed.connect(self.script_failed)
+
+        # Scripts compiled ahead of their first run
+        self._warmup = None
+
+        # Asynchronous build
+        self._build_worker = None
+        self._build_queue = None
+        self._build_lazy = False
+        self._build_chunk_time = 0.0
+        self._build_timer = QtCore.QTimer(self)
+        self._build_timer.setInterval(0)
+        self._build_timer.timeout.connect(self._build_next_chunk)
+
         # Automatically add it to the parent menu
         parent = kwargs.get("parent", None)
         if parent:
@@ -102,16 +178,22 @@ class ScriptsMenu(QtWidgets.QMenu):
         if not parent:
             parent = self
 
-        menu = QtWidgets.QMenu(parent, title)
-        menu.setTitle(title)
-        menu.setObjectName(title)
-        menu.setTearOffEnabled(True)
-        parent.addMenu(menu)
+        with profiler.phase("create_menus"):
+            menu = QtWidgets.QMenu(parent, title)
+            menu.setTitle(title)
+            menu.setObjectName(title)
+            menu.setTearOffEnabled(True)
+            parent.addMenu(menu)
+
+        # Hidden until an item is added to it, like a menu without matches
+        self._menu_tree.add_menu(menu, parent)
+        menu.menuAction().setVisible(False)
+        profiler.count("menus")
 
         return menu
 
     def add_script(self, parent, title, command, sourcetype, icon=None,
-                   tags=None, label=None, tooltip=None):
+                   tags=None, label=None, tooltip=None, execution=None):
         """Create an action item which runs a script when clicked
 
         Args:
@@ -134,59 +216,71 @@ class ScriptsMenu(QtWidgets.QMenu):
 
             tooltip (str): A tip for the user about the usage fo the tool
 
+            execution (str): Run the script on the GUI thread with `main`,
+                             the default, or in the background in a
+                             `thread` or a separate `process`
+
         Returns:
             QtWidget.QAction instance
 
         """
 
-        assert tags is None or isinstance(tags, (list, tuple))
-        # Ensure tags is a list
-        tags = list() if tags is None else list(tags)
-        tags.append(title.lower())
-
-        assert icon is None or isinstance(icon, str), (
-            "Invalid data type for icon, supported : None, string")
+        item = model.ScriptItem(title, command, sourcetype, icon=icon,
+                                tags=tags, label=label, tooltip=tooltip,
+                                execution=execution)
+        script_action = self._create_script(parent, item)
+        with profiler.phase("add_actions"):
+            parent.addAction(script_action)
+            self._register_scripts(parent, [script_action])
 
-        # create new action
-        script_action = action.Action(parent)
-        script_action.setText(title)
-        script_action.setObjectName(title)
-        script_action.tags = tags
+        return script_action
 
-        # link action to root for callback library
-        script_action.root = self
+    def add_scripts(self, parent, scripts):
+        """Create many action items at once
 
-        # Set up the command
-        script_action.sourcetype = sourcetype
-        script_action.command = command
+        All actions are created and validated before any is added to the
+        parent. They are then added in one go with updates and signals of
+        the parent suspended.
 
-        try:
-            script_action.process_command()
-        except RuntimeError as e:
-            raise RuntimeError("Script action can't be "
-                               "processed: {}".format(e))
+        Args:
+            parent (QtWidget.QWidget): The widget to parent the items to
 
-        if icon:
-            iconfile = os.path.expandvars(icon)
-            script_action.iconfile = iconfile
-            script_action_icon = QtWidgets.QIcon(iconfile)
-            script_action.setIcon(script_action_icon)
+            scripts (iterable): Dictionaries with the keyword arguments of
+                                `add_script` for each item
 
-        if label:
-            script_action.label = label
+        Returns:
+            list: the QtWidget.QAction instances
 
-        if tooltip:
-            script_action.setStatusTip(tooltip)
+        """
+        items = [model.ScriptItem(**script) for script in scripts]
+        return self._add_scripts(parent, items)
 
-        script_action.triggered.connect(script_action.run_command)
-        parent.addAction(script_action)
+    def _add_scripts(self, parent, items):
+        """Create the actions of script items and add them to parent"""
 
-        # Add to our searchable actions
-        self._script_actions.append(script_action)
+        script_actions = []
+        try:
+            for item in items:
+                script_actions.append(self._create_script(parent, item))
+        except Exception:
+            for script_action in script_actions:
+                script_action.deleteLater()
+            raise
+
+        updates = parent.updatesEnabled()
+        parent.setUpdatesEnabled(False)
+        blocked = parent.blockSignals(True)
+        try:
+            with profiler.phase("add_actions"):
+                parent.addActions(script_actions)
+                self._register_scripts(parent, script_actions)
+        finally:
+            parent.blockSignals(blocked)
+            parent.setUpdatesEnabled(updates)
 
-        return script_action
+        return script_actions
 
-    def build_from_configuration(self, parent, configuration):
+    def build_from_configuration(self, parent, configuration, lazy=False):
         """Process the configurations and store the configuration
 
         This creates all submenus from a configuration.json file.
@@ -197,60 +291,597 @@ class ScriptsMenu(QtWidgets.QMenu):
         Args:
             parent (ScriptsMenu): script menu instance
             configuration (list): A ScriptsMenu configuration list
+            lazy (bool): Only create the submenus, their items are created
+                         when a submenu is shown for the first time
 
         Returns:
             None
 
         """
 
-        for item in configuration:
-            assert isinstance(item, dict), "Configuration is wrong!"
+        with profiler.report("build_from_configuration"):
+            with profiler.phase("create_model"):
+                items = model.from_configuration(configuration)
+            self._build(parent, items, lazy)
+
+        self._start_prefetch()
+
+    def _build(self, parent, items, lazy):
+        """Create the menus and actions of model items in a parent"""
+
+        # Consecutive actions are added together
+        entries = self._configured[parent]
+        for item_type, group in groupby(items, _group_type):
+            group = list(group)
+            if item_type == "action":
+                nodes = self._add_scripts(parent, group)
+            else:
+                nodes = [self._build_item(parent, item, lazy)
+                         for item in group]
+
+            # Remember what was built for updating it later
+            for node, item in zip(nodes, group):
+                if node is not None:
+                    entries[_item_key(item, entries)] = (node, item)
+
+    def build_async(self, parent, configuration, lazy=False, cache=False,
+                    chunk_time=10):
+        """Build a configuration without blocking the user interface
+
+        The configuration is loaded and validated on a worker thread. The
+        menus and actions are then created on the main thread in chunks
+        which each take about `chunk_time` milliseconds, so the host
+        application keeps responding in between. Searching finds the items
+        built so far.
+
+        `build_progress` is emitted with the number of built and total
+        items after every chunk, followed by `build_finished` or
+        `build_failed`. Starting another build cancels the running one.
 
-            # skip items which have no `type` key
-            item_type = item.get('type', None)
-            if not item_type:
-                log.warning("Missing 'type' from configuration item")
-                continue
+        Args:
+            parent (ScriptsMenu): script menu instance
+            configuration (list, str): A ScriptsMenu configuration list,
+                                       the path of a configuration file or
+                                       a list of paths of layers
+            lazy (bool): Only create the submenus, their items are created
+                         when a submenu is shown for the first time
+            cache (bool): use the compiled configuration cache when
+                          loading configuration files
+            chunk_time (int): milliseconds to spend per chunk
+
+        Returns:
+            None
+
+        """
+
+        self.cancel_build()
+
+        worker = asyncbuild.Worker(
+            partial(_load_model, configuration, cache), self)
+        worker.succeeded.connect(
+            partial(self._start_chunked_build, worker, parent))
+        worker.failed.connect(partial(self._on_build_failed, worker))
+        worker.finished.connect(worker.deleteLater)
+
+        self._build_worker = worker
+        self._build_lazy = lazy
+        self._build_chunk_time = chunk_time / 1000.0
+        worker.start()
+
+    def is_building(self):
+        """Return whether an asynchronous build is running"""
+        return (self._build_worker is not None or
+                self._build_queue is not None)
+
+    def cancel_build(self):
+        """Stop the running asynchronous build
+
+        The items built so far are kept.
+
+        Returns:
+            None
+
+        """
+        self._build_worker = None
+        self._build_queue = None
+        self._build_timer.stop()
+
+    def update_from_configuration(self, parent, configuration, lazy=False):
+        """Update the items built from a configuration to a new configuration
+
+        Items are identified by their type, title and command within their
+        parent menu. Only the items which are new, gone or changed in the
+        new configuration are added, removed or modified, all other menus
+        and actions are kept as they are.
+
+        Args:
+            parent (ScriptsMenu): script menu instance
+            configuration (list): A ScriptsMenu configuration list
+            lazy (bool): Only create new submenus, their items are created
+                         when a submenu is shown for the first time
+
+        Returns:
+            dict: the number of added, removed and modified items
+
+        """
+
+        counts = {"added": 0, "removed": 0, "modified": 0}
+
+        updates = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        try:
+            with profiler.report("update_from_configuration") as report:
+                with profiler.phase("create_model"):
+                    items = model.from_configuration(configuration)
+                self._update_items(parent, items, lazy, counts)
+                if report is not None:
+                    for key, amount in counts.items():
+                        report.count(key, amount)
+
+            # Drop the removed actions and hide new ones not matching the
+            # current search
+            self._script_actions = [script_action for script_action in
+                                    self._script_actions
+                                    if script_action in self._search_index]
+            self._update_search(self.searchbar.text())
+        finally:
+            self.setUpdatesEnabled(updates)
+
+        self._start_prefetch()
+        return counts
+
+    def build_from_files(self, paths, snapshot_path=None, lazy=False):
+        """Build configuration files, restoring a snapshot when unchanged
+
+        The first build writes a snapshot of the menu and its search index.
+        As long as the files and the environment variables they use do not
+        change, later builds restore the snapshot, which skips loading the
+        files and processing and indexing every item.
+
+        Args:
+            paths (str, list): the configuration file or a list of layers
+            snapshot_path (str, optional): the snapshot file, by default
+                                           stored in the cache folder
+            lazy (bool): Only create the submenus, their items are created
+                         when a submenu is shown for the first time
+
+        Returns:
+            bool: whether the snapshot was restored
+
+        """
+
+        if isinstance(paths, str):
+            paths = [paths]
+        if snapshot_path is None:
+            snapshot_path = snapshot.get_snapshot_path(self.objectName(),
+                                                       paths)
+
+        if self.load_snapshot(snapshot_path, paths, lazy=lazy):
+            return True
+
+        if len(paths) == 1:
+            configuration = load_configuration(paths[0], cache=True)
+        else:
+            configuration = load_configuration_layers(paths, cache=True)
+        self.build_from_configuration(self, configuration, lazy=lazy)
+        self.save_snapshot(snapshot_path, paths)
+
+        return False
+
+    def save_snapshot(self, path, inputs):
+        """Write the items built in the menu and their search index to a file
 
-            # add separator
-            # Special behavior for separators
-            if item_type == "separator":
-                parent.addSeparator()
+        Args:
+            path (str): the snapshot file
+            inputs (list): the files the menu was built from
+
+        Returns:
+            None
+
+        """
+
+        with profiler.report("save_snapshot"):
+            items = [item for _, item in self._configured[self].values()]
+            tags = set(tag for script in model.iter_scripts(items)
+                       for tag in script.search_tags())
+            snapshot.save(path, items, self._search_index.dump_grams(tags),
+                          inputs)
+
+    def load_snapshot(self, path, inputs, lazy=False):
+        """Build the menu from a snapshot when its inputs did not change
+
+        The items are created without processing their commands again and
+        the search index is restored instead of indexing every item.
+
+        Args:
+            path (str): the snapshot file
+            inputs (list): the files the menu is built from
+            lazy (bool): Only create the submenus, their items are created
+                         when a submenu is shown for the first time
 
-            # add submenu
-            # items should hold a collection of submenu items (dict)
-            elif item_type == "menu":
-                assert "items" in item, "Menu is missing 'items' key"
-                menu = self.add_menu(parent=parent, title=item["title"])
-                self.build_from_configuration(menu, item["items"])
+        Returns:
+            bool: whether the snapshot was restored
+
+        """
+
+        with profiler.report("load_snapshot"):
+            with profiler.phase("read_snapshot"):
+                data = snapshot.load(path, inputs)
+            if data is None:
+                return False
+
+            items, grams = data
+            self._restoring = []
+            try:
+                self._build(self, items, lazy)
+            finally:
+                entries, self._restoring = self._restoring, None
+
+            with profiler.phase("restore_index"):
+                self._search_index.restore(entries, grams)
+            self._update_search(self.searchbar.text())
 
-            # add script
-            elif item_type == "action":
-                # filter out `type` from the item dict
-                config = {key: value for key, value in
-                          item.items() if key != "type"}
+        return True
 
-                self.add_script(parent=parent, **config)
+    def configuration(self, parent=None):
+        """Return the configuration of the items built in a parent
+
+        The configuration is serialized from the model, no actions or menus
+        are read.
+
+        Args:
+            parent (QtWidgets.QMenu): the menu, defaults to the scripts menu
+
+        Returns:
+            list: A ScriptsMenu configuration list
+
+        """
+        if parent is None:
+            parent = self
+
+        entries = self._configured.get(parent, {})
+        return model.to_configuration([item for _, item in entries.values()])
 
     def set_update_visible(self, state):
         self.update_action.setVisible(state)
 
+    def set_incremental_search(self, state):
+        """Narrow down the previous search results while typing
+
+        Args:
+            state (bool): whether to search incrementally
+
+        Returns:
+            None
+
+        """
+        if not state:
+            self._incremental_search = None
+        elif self._incremental_search is None:
+            self._incremental_search = searchindex.IncrementalSearch(
+                self._search_index)
+
+    def set_ranked_search(self, state, limit=20):
+        """Show the best matches of a search in a flat list of results
+
+        Instead of hiding the actions which do not match, the menu shows the
+        `limit` actions matching the search best above the other items,
+        which are hidden while searching. Titles, tags, labels and tooltips
+        are matched, also when their characters are only found in order.
+
+        Args:
+            state (bool): whether to rank the search results
+            limit (int): the maximum number of results
+
+        Returns:
+            None
+
+        """
+
+        search = self.searchbar.text()
+        if state and self._ranked_index is None:
+            # Undo the filtering of the current search
+            self._update_search("")
+
+            self._ranked_index = searchindex.RankedIndex()
+            nodes = list(self._script_actions)
+            for placeholders in self._placeholders.values():
+                nodes.extend(placeholders)
+            for node in nodes:
+                self._rank_script(node, _get_item(node))
+
+        elif not state and self._ranked_index is not None:
+            self._show_results([], searching=False)
+            self._ranked_index = None
+
+        self._ranked_limit = limit
+        self._update_search(search)
+
+    def set_usage_tracker(self, tracker, prefetch=5):
+        """Record the scripts which are run and favor them
+
+        Every run is recorded in the tracker. Ranked search boosts the
+        results by their usage and the `prefetch` deferred menus holding the
+        most used scripts are built, and their icons loaded, while the host
+        application is idle.
+
+        Args:
+            tracker (usage.UsageTracker): the usage statistics, None to stop
+                                          recording usage
+
+            prefetch (int): the maximum number of menus to build ahead
+
+        Returns:
+            None
+
+        """
+
+        self._usage = tracker
+        self._prefetch = prefetch
+        self._boosts.clear()
+
+        if tracker is not None:
+            nodes = list(self._script_actions)
+            for placeholders in self._placeholders.values():
+                nodes.extend(placeholders)
+            for node in nodes:
+                self._boost_script(node, _get_item(node))
+
+        self._start_prefetch()
+
+    def record_usage(self, script_action):
+        """Record a run of a script action in the usage tracker
+
+        The boost of every script action and placeholder of the same script
+        is updated, the action may be a ranked search result showing it.
+
+        Args:
+            script_action (action.Action): the action which was triggered
+
+        Returns:
+            None
+
+        """
+
+        if self._usage is None:
+            return
+
+        item = script_action.item
+        self._usage.record(item.title, item.command)
+
+        key = (item.title, item.command)
+        nodes = list(self._script_actions)
+        for placeholders in self._placeholders.values():
+            nodes.extend(placeholders)
+        for node in nodes:
+            node_item = _get_item(node)
+            if (node_item.title, node_item.command) == key:
+                self._boost_script(node, node_item)
+
+    def set_auto_update(self, state, paths=None, polling=False):
+        """Emit `updated` when configuration files or file scripts change
+
+        Changes are collected over a short time and trigger one update.
+
+        Args:
+            state (bool): whether to watch for changes
+
+            paths (list): the configuration files the menu is built from
+
+            polling (bool): poll the files instead of relying on filesystem
+                            notifications, e.g. for network mounts
+
+        Returns:
+            None
+
+        """
+
+        if self._watcher is not None and (not state or
+                                          self._watcher.polling != polling):
+            self._watcher.stop()
+            self._watcher.deleteLater()
+            self._watcher = None
+
+        if not state:
+            self._watched_configurations = []
+            return
+
+        if self._watcher is None:
+            self._watcher = watcher.FileWatcher(self, polling=polling)
+            self._watcher.changed.connect(self._on_files_changed)
+
+        self._watched_configurations = list(paths or [])
+        self._update_watched_paths()
+
     def clear_menu(self):
         """Clear all menu items which are not default
 
+        The removed actions and submenus are deleted, which also deletes
+        the actions built in the submenus and their signal connections.
+        All references to them are dropped from the search indexes.
+
         Returns:
             None
 
         """
 
-        # TODO: Set up a more robust implementation for this
-        # Delete all except the first three actions
+        self.cancel_build()
+        self.cancel_warmup()
+        self._prefetch_timer.stop()
+
+        for slots in (self._populate_slots, self._icon_slots):
+            for menu in list(slots):
+                _disconnect_slot(slots, menu)
+
+        # Delete all except the first three actions, a submenu owns its
+        # menu action and everything built in it
         for _action in self.actions()[3:]:
             self.removeAction(_action)
+            menu = _action.menu()
+            _delete_node(menu if menu is not None else _action)
+
+        # All script actions live below the removed items
+        self._script_actions = []
+        self._visible_actions = set()
+        self._search_index.clear()
+        if self._ranked_index is not None:
+            self._ranked_index.clear()
+        self._result_actions = []
+        self._showing_results = False
+        self._menu_tree.clear()
+        self._pending_menus.clear()
+        self._placeholders.clear()
+        self._pending_icons.clear()
+        self._configured.clear()
+        self._boosts.clear()
+
+    def memory_usage(self):
+        """Return the number of live objects of the menu and their memory
+
+        The Qt objects are all objects owned by the menu, including deleted
+        ones which wait for the event loop to delete them. The `bytes` are
+        the approximate memory of the search indexes, the menu tree and the
+        bookkeeping of the menu, the memory Qt allocates for its objects is
+        not included.
+
+        Returns:
+            dict
+
+        """
+
+        containers = [self._script_actions, self._visible_actions,
+                      self._result_actions, self._pending_menus,
+                      self._placeholders, self._pending_icons,
+                      self._populate_slots, self._icon_slots,
+                      self._configured, self._boosts]
+        containers.extend(self._placeholders.values())
+        containers.extend(self._pending_icons.values())
+        containers.extend(self._configured.values())
+
+        size = sum(sys.getsizeof(container) for container in containers)
+        size += self._search_index.memory_footprint()
+        size += self._menu_tree.memory_footprint()
+        if self._ranked_index is not None:
+            size += self._ranked_index.memory_footprint()
+
+        return {
+            "qt_objects": len(self.findChildren(QtCore.QObject)),
+            "menus": len(self.findChildren(QtWidgets.QMenu)),
+            "actions": len(self._script_actions),
+            "placeholders": sum(len(placeholders) for placeholders in
+                                self._placeholders.values()),
+            "pending_menus": len(self._pending_menus),
+            "pending_icons": sum(len(pending) for pending in
+                                 self._pending_icons.values()),
+            "result_actions": len(self._result_actions),
+            "indexed": len(self._search_index),
+            "boosts": len(self._boosts),
+            "cached_icons": len(iconcache.icon_cache),
+            "bytes": size
+        }
 
     def register_callback(self, modifiers, callback):
         self._callbacks[modifiers].append(callback)
 
+    def run_in_background(self, script_action):
+        """Run the command of a script action outside of the GUI thread
+
+        `script_finished` or `script_failed` is emitted with the job once
+        the command is done. Commands run in the background may not touch
+        any widgets.
+
+        Args:
+            script_action (action.Action): the action with a `thread` or
+                                           `process` execution
+
+        Returns:
+            executor.Job
+
+        """
+
+        if script_action.sourcetype == "file":
+            command = model.resolve_filepath(script_action.command)
+        else:
+            command = script_action.processed_command()
+
+        job = executor.Job(script_action.text(), script_action.execution,
+                           script_action.sourcetype, command,
+                           code=script_action.compiled_command())
+        return self._jobs.submit(job)
+
+    def set_max_jobs(self, count):
+        """Set the number of scripts which can run in the background at once
+
+        Args:
+            count (int): the maximum number of running jobs
+
+        Returns:
+            None
+
+        """
+        self._jobs.set_max_jobs(count)
+
+    def jobs(self):
+        """Return the running and queued background jobs
+
+        Returns:
+            list
+
+        """
+        return self._jobs.jobs()
+
+    def cancel_jobs(self):
+        """Cancel all running and queued background jobs"""
+        self._jobs.cancel_all()
+
+    def warm_up(self, max_workers=4):
+        """Compile the scripts of all `file` actions in the background
+
+        Every script is read and compiled on a pool of `max_workers`
+        threads so the first click on an action is as fast as later ones.
+        Scripts in submenus which are not built yet are included.
+
+        `warmup_progress` is emitted with the number of compiled and total
+        scripts after every script, `warmup_failed` with the path and error
+        of scripts which are missing or can't be compiled and
+        `warmup_finished` once all are done. Starting another warm-up
+        cancels the running one.
+
+        Args:
+            max_workers (int): the number of scripts read at once
+
+        Returns:
+            warmup.Warmup
+
+        """
+
+        self.cancel_warmup()
+
+        nodes = list(self._script_actions)
+        for placeholders in self._placeholders.values():
+            nodes.extend(placeholders)
+
+        paths = OrderedDict()
+        for node in nodes:
+            item = _get_item(node)
+            if item.sourcetype == "file":
+                paths[model.resolve_filepath(item.command)] = None
+
+        self._warmup = warmup.Warmup(paths, parent=self,
+                                     max_workers=max_workers)
+        self._warmup.progress.connect(self.warmup_progress)
+        self._warmup.failed.connect(self.warmup_failed)
+        self._warmup.finished.connect(self.warmup_finished)
+        self._warmup.start()
+
+        return self._warmup
+
+    def cancel_warmup(self):
+        """Stop compiling the scripts which did not start compiling yet"""
+        if self._warmup is not None:
+            self._warmup.cancel()
+            self._warmup = None
+
     def _update_search(self, search):
         """Hide all the samples which do not match the user's import
         
@@ -259,30 +890,720 @@ class ScriptsMenu(QtWidgets.QMenu):
 
         """
 
-        if not search:
-            for action in self._script_actions:
-                action.setVisible(True)
+        if self._ranked_index is not None:
+            nodes = self._ranked_index.query(search, self._ranked_limit,
+                                             boosts=self._boosts)
+            # Without matches the items stay hidden behind no results
+            self._show_results(nodes, searching=bool(search.split()))
+            return
+
+        matches = self._find_matches(search.lower())
+
+        # Only touch the actions of which the visibility changes, every
+        # setVisible call makes Qt lay out the menu again
+        hide = self._visible_actions - matches
+        show = matches - self._visible_actions
+        if not hide and not show:
+            return
+
+        updates = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        try:
+            changed = set()
+            for action in hide:
+                self._set_action_visible(action, False, changed)
+            for action in show:
+                self._set_action_visible(action, True, changed)
+
+            self._visible_actions -= hide
+            self._visible_actions |= show
+
+            # Collapse the submenus of which no children are left visible
+            self._apply_menu_visibility(changed)
+        finally:
+            self.setUpdatesEnabled(updates)
+
+    def _create_script(self, parent, item):
+        """Create and validate the action of a script item without adding it
+        to parent"""
+
+        _validate_script(item)
+
+        # create new action
+        with profiler.phase("create_actions"):
+            script_action = action.Action(parent, item=item)
+            blocked = script_action.blockSignals(True)
+
+            script_action.setText(item.title)
+            script_action.setObjectName(item.title)
+
+        # link action to root for callback library
+        script_action.root = self
+
+        try:
+            # Restored scripts were processed when the snapshot was made
+            if self._restoring is None:
+                with profiler.phase("process_command"):
+                    script_action.process_command()
+        except RuntimeError as e:
+            script_action.deleteLater()
+            profiler.count("failures")
+            raise RuntimeError("Script action can't be "
+                               "processed: {}".format(e))
+
+        if item.icon:
+            # The icon of an action in a hidden menu is loaded once the
+            # menu is shown
+            self._defer_icon(parent, script_action)
+            profiler.count("icons")
+
+        if item.tooltip:
+            script_action.setStatusTip(item.tooltip)
+
+        script_action.blockSignals(blocked)
+        script_action.triggered.connect(script_action.run_command)
+        profiler.count("actions")
+
+        return script_action
+
+    def _register_scripts(self, parent, script_actions):
+        """Add script actions to the search index and the menu tree"""
+
+        changed = set()
+        for script_action in script_actions:
+            self._index_script(script_action, script_action.item)
+            changed |= self._menu_tree.add_action(script_action, parent)
+
+        # Add to our searchable actions
+        self._script_actions.extend(script_actions)
+        self._visible_actions.update(script_actions)
+
+        self._apply_menu_visibility(changed)
+
+    def _build_item(self, parent, item, lazy):
+        """Create the separator, menu or action of a model item
+
+        Returns:
+            QtWidgets.QAction, QtWidgets.QMenu or None
+
+        """
+
+        item_type = item.type
+
+        # add separator
+        # Special behavior for separators
+        if item_type == "separator":
+            return parent.addSeparator()
+
+        # add submenu
+        # items should hold a collection of submenu items (dict)
+        elif item_type == "menu":
+            menu = self.add_menu(parent=parent, title=item.title)
+            try:
+                if lazy:
+                    self._defer_menu(menu, item.items)
+                else:
+                    self._build(menu, item.items, lazy)
+            except Exception:
+                # Do not leave a half built submenu behind
+                self._remove_node(parent, menu)
+                raise
+            return menu
+
+        # add script
+        elif item_type == "action":
+            return self._add_scripts(parent, [item])[0]
+
+    def _start_chunked_build(self, worker, parent, items):
+        """Start creating the loaded items on the main thread"""
+        if worker is not self._build_worker:
+            # Cancelled
+            return
+
+        self._build_worker = None
+        self._build_queue = asyncbuild.BuildQueue(parent, items)
+        self._build_timer.start()
+
+    def _build_next_chunk(self):
+        """Create the next items of the running build within the time limit"""
+
+        queue = self._build_queue
+        if queue is None:
+            self._build_timer.stop()
+            return
+
+        end = time.perf_counter() + self._build_chunk_time
+        try:
+            with profiler.report("build_chunk"):
+                # At least one batch per chunk to always make progress
+                while True:
+                    batch = queue.next_batch(size=50)
+                    if batch is None:
+                        break
+                    parent, items = batch
+                    queue.done += self._build_batch(parent, items, queue)
+                    if time.perf_counter() >= end:
+                        break
+
+                # Hide the new items which do not match the current search
+                self._update_search(self.searchbar.text())
+        except Exception as e:
+            log.exception("Building the menu failed")
+            self.cancel_build()
+            self.build_failed.emit(str(e))
+            return
+
+        self.build_progress.emit(queue.done, queue.total)
+        if batch is None:
+            self.cancel_build()
+            self.build_finished.emit()
+            self._start_prefetch()
+
+    def _build_batch(self, parent, items, queue):
+        """Create a batch of items of the running build
+
+        Returns:
+            int: the number of items which are done
+
+        """
+
+        if items[0].type == "action":
+            nodes = self._add_scripts(parent, items)
+            done = len(items)
         else:
-            for action in self._script_actions:
-                action.setVisible(action.has_tag(search.lower()))
+            # A single separator or menu, the items of a menu are queued
+            item = items[0]
+            if item.type == "menu" and not self._build_lazy:
+                node = self.add_menu(parent=parent, title=item.title)
+                queue.push(node, item.items)
+                done = 1
+            else:
+                node = self._build_item(parent, item, self._build_lazy)
+                done = model.count_items(item)
+            nodes = [node]
+
+        entries = self._configured[parent]
+        for node, item in zip(nodes, items):
+            if node is not None:
+                entries[_item_key(item, entries)] = (node, item)
+
+        return done
+
+    def _on_build_failed(self, worker, message):
+        if worker is not self._build_worker:
+            return
+        self._build_worker = None
+        self.build_failed.emit(message)
+
+    def _update_items(self, parent, items, lazy, counts):
+        """Match the items built in a parent to new model items"""
+
+        previous = self._configured.pop(parent, OrderedDict())
+        entries = OrderedDict()
+        try:
+            for item in items:
+                key = _item_key(item, entries)
+                if key in previous:
+                    node, previous_item = previous[key]
+                    if (item.type == "menu" and
+                            node not in self._pending_menus):
+                        # Match the items of built menus one by one
+                        self._update_node(node, item, lazy, counts)
+                    elif item.values() == previous_item.values():
+                        # Keep the item the node was built from
+                        item = previous_item
+                    else:
+                        self._update_node(node, item, lazy, counts)
+                    del previous[key]
+                else:
+                    node = self._build_item(parent, item, lazy)
+                    if node is None:
+                        continue
+                    counts["added"] += model.count_items(item)
+
+                entries[key] = (node, item)
+        except Exception:
+            # Remember every node still in the parent, the next update
+            # matches them again instead of adding them twice
+            entries.update(previous)
+            self._configured[parent] = entries
+            raise
+
+        for node, item in previous.values():
+            self._remove_node(parent, node)
+            counts["removed"] += model.count_items(item)
+
+        self._configured[parent] = entries
+        self._sort_actions(parent, [node for node, _ in entries.values()])
+
+    def _update_node(self, node, item, lazy, counts):
+        """Update a menu or action of which the configuration changed"""
+
+        item_type = item.type
+        if item_type == "menu":
+            if node in self._pending_menus:
+                # Not built yet, only swap the items to build from
+                changed = self._clear_placeholders(node)
+                self._apply_menu_visibility(changed)
+                self._add_placeholders(node, item.items)
+                counts["modified"] += 1
+            else:
+                self._update_items(node, item.items, lazy, counts)
+                item.items = [child for _, child in
+                              self._configured[node].values()]
+
+        elif item_type == "action":
+            self._update_script(node, item)
+            counts["modified"] += 1
+
+    def _update_script(self, script_action, item):
+        """Show a changed script item with an existing script action"""
+
+        _validate_script(item)
+
+        previous_icon = script_action.iconfile
+        script_action.item = item
+        self._index_script(script_action, item)
+
+        try:
+            script_action.process_command()
+        except RuntimeError as e:
+            raise RuntimeError("Script action can't be "
+                               "processed: {}".format(e))
+
+        script_action.setStatusTip(item.tooltip or "")
+
+        if script_action.iconfile != previous_icon:
+            script_action.setIcon(QtGui.QIcon())
+            if item.icon:
+                parent = self._menu_tree.parent(script_action)
+                self._defer_icon(parent, script_action)
+
+    def _remove_node(self, parent, node):
+        """Remove a separator, menu or action and delete it"""
+
+        self._forget(node)
+        if node in self._menu_tree:
+            self._apply_menu_visibility(self._menu_tree.remove(node))
+
+        if isinstance(node, QtWidgets.QMenu):
+            parent.removeAction(node.menuAction())
+        else:
+            parent.removeAction(node)
+        _delete_node(node)
+
+    def _forget(self, node):
+        """Drop all references to a node and the nodes below it"""
+
+        for child in self._menu_tree.children(node):
+            self._forget(child)
+
+        self._unindex_script(node)
+        self._visible_actions.discard(node)
+        self._pending_menus.pop(node, None)
+        self._placeholders.pop(node, None)
+        self._pending_icons.pop(node, None)
+        _disconnect_slot(self._populate_slots, node)
+        _disconnect_slot(self._icon_slots, node)
+        self._configured.pop(node, None)
+
+    def _sort_actions(self, parent, nodes):
+        """Order the actions in a parent like the configuration"""
 
-        # Set visibility for all submenus
-        for action in self.actions():
-            if not action.menu():
+        ordered = [node.menuAction() if isinstance(node, QtWidgets.QMenu)
+                   else node for node in nodes]
+
+        members = set(ordered)
+        current = [item for item in parent.actions() if item in members]
+        if current == ordered:
+            return
+
+        for item in ordered:
+            parent.removeAction(item)
+        parent.addActions(ordered)
+
+    def _update_watched_paths(self):
+        """Watch the configuration files and the scripts of all actions"""
+
+        paths = set(self._watched_configurations)
+        for script_action in self._script_actions:
+            if script_action.sourcetype == "file":
+                paths.add(model.resolve_filepath(script_action.command))
+
+        for placeholders in self._placeholders.values():
+            for placeholder in placeholders:
+                if placeholder.sourcetype == "file":
+                    paths.add(model.resolve_filepath(placeholder.command))
+
+        self._watcher.set_paths(paths)
+
+    def _on_files_changed(self, paths):
+        log.info("Updating menu, changed: {}".format(", ".join(paths)))
+        self.on_update()
+
+        # The update may have added or removed scripts
+        if self._watcher is not None:
+            self._update_watched_paths()
+
+    def _set_action_visible(self, action, state, changed):
+        """Set the visibility of a script action or placeholder"""
+        if not isinstance(action, model.ScriptItem):
+            action.setVisible(state)
+        self._menu_tree.set_action_visible(action, state, changed)
+
+    def _defer_menu(self, menu, items):
+        """Build the items of a menu once it is about to be shown
+
+        Every script below the menu is added as a placeholder to the search
+        index and menu tree so searching can find it before it is built.
+        The script items of the model are the placeholders.
+
+        """
+
+        self._add_placeholders(menu, items)
+        slot = self._populate_slots[menu] = partial(self._populate_menu,
+                                                    menu)
+        menu.aboutToShow.connect(slot)
+
+    def _add_placeholders(self, menu, items):
+        """Store the items of a deferred menu with its placeholders"""
+
+        self._pending_menus[menu] = items
+
+        changed = set()
+        placeholders = self._placeholders[menu]
+        for placeholder in model.iter_scripts(items):
+            placeholders.append(placeholder)
+            self._visible_actions.add(placeholder)
+            self._index_script(placeholder, placeholder)
+            changed |= self._menu_tree.add_action(placeholder, menu)
+
+        self._apply_menu_visibility(changed)
+
+    def _clear_placeholders(self, menu):
+        """Remove the placeholders of a deferred menu
+
+        Returns:
+            set: the menus of which the visibility changed
+
+        """
+
+        changed = set()
+        for placeholder in self._placeholders.pop(menu, []):
+            self._visible_actions.discard(placeholder)
+            self._unindex_script(placeholder)
+            changed |= self._menu_tree.remove(placeholder)
+
+        return changed
+
+    def _populate_menu(self, menu):
+        """Replace the placeholders of a deferred menu with its items"""
+
+        items = self._pending_menus.pop(menu, None)
+        if items is None:
+            return
+        _disconnect_slot(self._populate_slots, menu)
+
+        changed = self._clear_placeholders(menu)
+
+        updates = menu.updatesEnabled()
+        menu.setUpdatesEnabled(False)
+        try:
+            with profiler.report("populate_menu"):
+                self._build(menu, items, lazy=True)
+                self._apply_menu_visibility(changed)
+
+                # Hide the new items which do not match the current search
+                self._update_search(self.searchbar.text())
+
+                # The menu is already showing, load its icons right away
+                self._load_icons(menu)
+        finally:
+            menu.setUpdatesEnabled(updates)
+
+    def _defer_icon(self, menu, script_action):
+        """Set the icon of the action once its menu is about to be shown
+
+        Actions in a menu which is already shown, or in a parent which is
+        not a menu, like a toolbar, get their icon right away.
+
+        """
+        if not isinstance(menu, QtWidgets.QMenu) or menu.isVisible():
+            icon = iconcache.icon_cache.get(script_action.iconfile)
+            if icon is not None:
+                script_action.setIcon(icon)
+            return
+
+        pending = self._pending_icons.get(menu)
+        if pending is None:
+            pending = self._pending_icons[menu] = []
+            slot = self._icon_slots[menu] = partial(self._load_icons, menu)
+            menu.aboutToShow.connect(slot)
+        pending.append(script_action)
+
+    def _load_icons(self, menu):
+        """Set the icons of the actions in the menu from the icon cache"""
+        # Menus which are kept, like the scripts menu itself, would
+        # otherwise gain another connection every time icons are deferred
+        _disconnect_slot(self._icon_slots, menu)
+        pending = self._pending_icons.pop(menu, [])
+        with profiler.report("load_icons"), profiler.phase("load_icons"):
+            for script_action in pending:
+                if script_action not in self._search_index:
+                    # Removed by an update
+                    continue
+                icon = iconcache.icon_cache.get(script_action.iconfile)
+                if icon is not None:
+                    script_action.setIcon(icon)
+                    profiler.count("icons_loaded")
+
+    def _start_prefetch(self):
+        """Start building the hottest deferred menus while idle"""
+        if self._usage is None or not self._prefetch:
+            self._prefetch_timer.stop()
+            return
+
+        self._prefetch_left = self._prefetch
+        self._prefetch_timer.start()
+
+    def _prefetch_next(self):
+        """Build the deferred menu or load the icons holding the most used
+        scripts, one menu per tick"""
+
+        if self._prefetch_left <= 0:
+            self._prefetch_timer.stop()
+            return
+
+        boosts = self._boosts
+        best = None
+        for menu, placeholders in self._placeholders.items():
+            score = sum(boosts.get(node, 0.0) for node in placeholders)
+            if score > 0 and (best is None or score > best[0]):
+                best = (score, menu, self._populate_menu)
+        for menu, script_actions in self._pending_icons.items():
+            score = sum(boosts.get(node, 0.0) for node in script_actions)
+            if score > 0 and (best is None or score > best[0]):
+                best = (score, menu, self._load_icons)
+
+        if best is None:
+            self._prefetch_timer.stop()
+            return
+
+        _, menu, load = best
+        with profiler.report("prefetch"):
+            load(menu)
+        self._prefetch_left -= 1
+
+    def _apply_menu_visibility(self, menus):
+        """Show or hide submenus to match their visible children"""
+        for menu in menus:
+            if self._showing_results and self._menu_tree.parent(menu) is self:
+                # Hidden behind the search results
                 continue
 
-            menu = action.menu()
-            visible = any(action.isVisible() for action in menu.actions())
-            action.setVisible(visible)
+            menu_action = menu.menuAction()
+            visible = self._menu_tree.is_visible(menu)
+            if visible != menu_action.isVisible():
+                menu_action.setVisible(visible)
+
+    def _index_script(self, node, item):
+        """Add a script action or placeholder to the search indexes"""
+        if self._restoring is not None:
+            # Added at once when the snapshot is restored
+            self._restoring.append((node, item.search_tags()))
+        else:
+            self._search_index.add(node, item.search_tags())
+        if self._ranked_index is not None:
+            self._rank_script(node, item)
+        if self._usage is not None:
+            self._boost_script(node, item)
+
+    def _reindex_script(self, script_action):
+        """Index a script action again after its values were set"""
+        if script_action not in self._search_index:
+            # Not built by this menu, like the search results
+            return
+        self._index_script(script_action, script_action.item)
+        self._update_search(self.searchbar.text())
+
+    def _rank_script(self, node, item):
+        """Add a script action or placeholder to the ranked search index"""
+        self._ranked_index.add(node, item.title, item.tags, item.label,
+                               item.tooltip)
+
+    def _boost_script(self, node, item):
+        """Store the boost of a script action or placeholder by its usage"""
+        boost = self._usage.boost(item.title, item.command)
+        if boost > 0:
+            self._boosts[node] = boost
+        else:
+            self._boosts.pop(node, None)
+
+    def _unindex_script(self, node):
+        """Remove a node from the search indexes"""
+        self._search_index.remove(node)
+        self._boosts.pop(node, None)
+        if self._ranked_index is not None:
+            self._ranked_index.remove(node)
+
+    def _show_results(self, nodes, searching):
+        """Show ranked search results instead of the menu's items
+
+        The results are actions showing the items of the matching script
+        actions and placeholders. They are reused between searches. The
+        menu's items are hidden for as long as there is a search, also
+        when nothing matches it.
+
+        """
 
+        views = self._get_result_actions(len(nodes))
 
-def load_configuration(path):
+        updates = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        try:
+            for view, node in zip(views, nodes):
+                item = _get_item(node)
+                view.item = item
+                view.setText(item.title)
+                view.setStatusTip(item.tooltip or "")
+                icon = (iconcache.icon_cache.get(view.iconfile)
+                        if item.icon else None)
+                view.setIcon(icon if icon is not None else QtGui.QIcon())
+                view.setVisible(True)
+
+            for view in views[len(nodes):]:
+                if view.isVisible():
+                    view.setVisible(False)
+
+            if searching != self._showing_results:
+                self._showing_results = searching
+                self._set_items_visible(not searching)
+        finally:
+            self.setUpdatesEnabled(updates)
+
+    def _get_result_actions(self, count):
+        """Return the actions showing search results, at least `count`"""
+
+        views = self._result_actions
+        if len(views) >= count:
+            return views
+
+        new = []
+        for _ in range(count - len(views)):
+            view = action.Action(self)
+            view.root = self
+            view.setVisible(False)
+            view.triggered.connect(view.run_command)
+            new.append(view)
+
+        # Place them above the items of the menu
+        items = self._get_items()
+        if items:
+            self.insertActions(items[0], new)
+        else:
+            self.addActions(new)
+        views.extend(new)
+
+        return views
+
+    def _get_items(self):
+        """Return the actions below the default items and search results"""
+        views = set(self._result_actions)
+        return [item for item in self.actions()[3:] if item not in views]
+
+    def _set_items_visible(self, state):
+        """Hide or restore the items below the search results"""
+        for item in self._get_items():
+            menu = item.menu()
+            if not state:
+                item.setVisible(False)
+            elif menu is not None and menu in self._menu_tree:
+                item.setVisible(self._menu_tree.is_visible(menu))
+            else:
+                item.setVisible(item not in self._search_index or
+                                item in self._visible_actions)
+
+    def _find_matches(self, search):
+        """Return the script actions which match the search text"""
+        if self._incremental_search is not None:
+            return self._incremental_search.query(search)
+
+        return self._search_index.query(search)
+
+
+def _get_item(node):
+    """Return the model item of a script action or placeholder"""
+    return node if isinstance(node, model.ScriptItem) else node.item
+
+
+def _validate_script(item):
+    """Check the icon and execution of a script item before it is shown"""
+
+    assert item.icon is None or isinstance(item.icon, str), (
+        "Invalid data type for icon, supported : None, string")
+
+    execution = item.execution or "main"
+    assert execution in model.EXECUTION_MODES, (
+        "Invalid execution '{}', supported : {}".format(
+            execution, ", ".join(model.EXECUTION_MODES)))
+    assert (execution == "main" or
+            item.sourcetype in model.BACKGROUND_SOURCETYPES), (
+        "Only python and file scripts can run in the background")
+
+
+def _delete_node(node):
+    """Delete a menu, action or separator once control returns to the
+    event loop
+
+    Menus are unparented first, some bindings otherwise keep them alive in
+    a reference cycle with their menu action.
+
+    """
+    if isinstance(node, QtWidgets.QMenu):
+        node.setParent(None)
+    node.deleteLater()
+
+
+def _disconnect_slot(slots, menu):
+    """Disconnect the slot stored for a menu from its aboutToShow signal
+
+    The connection holds a reference to the menu, which is only released
+    with the menu by some bindings when it is disconnected.
+
+    """
+    slot = slots.pop(menu, None)
+    if slot is not None:
+        menu.aboutToShow.disconnect(slot)
+
+
+def _item_key(item, entries):
+    """Return the identity of a model item within its parent menu
+
+    Items are identified by their type, title and command, numbered to tell
+    apart the same item occurring more than once.
+
+    """
+    key = (item.type, item.title, item.command)
+    count = 0
+    while key + (count,) in entries:
+        count += 1
+    return key + (count,)
+
+
+def _group_type(item):
+    """Return `action` for actions so consecutive actions are grouped"""
+    return "action" if item.type == "action" else None
+
+
+def load_configuration(path, cache=False):
     """Load the configuration from a file
 
     Read out the JSON file which will dictate the structure of the scripts menu
 
     Args:
         path (str): file path of the .JSON file
+        cache (bool): use the compiled configuration cache which only parses
+                      the JSON file again when it changed
 
     Returns:
         dict
@@ -298,13 +1619,66 @@ def load_configuration(path):
         raise AttributeError("Given configuration file has unsupported "
                              "file type, provide a .json file")
 
-    # retrieve and store config
-    with open(path, "r") as f:
-        configuration = json.load(f)
+    with profiler.report("load_configuration"):
+        if cache:
+            with profiler.phase("load_cached"):
+                return configcache.load(path)
+
+        # retrieve and store config
+        with profiler.phase("parse_json"):
+            with open(path, "r") as f:
+                configuration = json.load(f)
 
     return configuration
 
 
+def load_configuration_layers(paths, cache=False):
+    """Load configuration files as layers merged into one configuration
+
+    Later layers extend, override or remove the items of earlier layers,
+    see `layers.merge`.
+
+    Args:
+        paths (list): file paths of the .JSON files, lowest layer first,
+                      e.g. the studio, show and user configuration
+        cache (bool): use the cache of the merged configuration which only
+                      reads the files again when any of them changed
+
+    Returns:
+        list
+
+    """
+
+    for path in paths:
+        if not os.path.isfile(path):
+            raise AttributeError("Given configuration is not "
+                                 "a file!\n'{}'".format(path))
+
+    with profiler.report("load_configuration_layers"):
+        if cache:
+            with profiler.phase("load_cached"):
+                return configcache.load_layers(paths)
+
+        configurations = []
+        with profiler.phase("parse_json"):
+            for path in paths:
+                with open(path, "r") as f:
+                    configurations.append(json.load(f))
+
+        with profiler.phase("merge_layers"):
+            return layers.merge(configurations)
+
+
+def _load_model(configuration, cache=False):
+    """Return the model of a configuration list, file or list of layers"""
+    if not isinstance(configuration, list):
+        configuration = load_configuration(configuration, cache=cache)
+    elif configuration and all(isinstance(path, str)
+                               for path in configuration):
+        configuration = load_configuration_layers(configuration, cache=cache)
+    return model.from_configuration(configuration)
+
+
 def application(configuration, parent):
     import sys
     app = QtWidgets.QApplication(sys.argv)
@@ -0,0 +1,684 @@
+import re
+import sys
+from itertools import groupby
+from collections import defaultdict
+
+
+class SearchIndex(object):
+    """Inverted index which maps tag substrings to the items holding the tag
+
+    Every tag is broken up in all of its substrings up to `GRAM` characters
+    long. A query of at most `GRAM` characters is a direct lookup, longer
+    queries intersect the tags of each of their grams and only verify the
+    remaining candidates.
+
+    This matches the partial tag match of `Action.has_tag` without going
+    over every item for each query.
+
+    """
+
+    GRAM = 3
+
+    def __init__(self):
+
+        self._items = dict()
+        self._tag_items = dict()
+        self._grams = defaultdict(set)
+
+        # Bumped on every change so cached results can be invalidated
+        self.revision = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def add(self, item, tags):
+        """Add an item to the index
+
+        When the item is already indexed its tags are replaced.
+
+        Args:
+            item (object): hashable item to index, e.g. an Action
+            tags (list, tuple): the tags of the item
+
+        Returns:
+            None
+
+        """
+
+        if item in self._items:
+            self.remove(item)
+
+        self.revision += 1
+        tags = tuple(set(sys.intern(str(tag)) for tag in tags))
+        self._items[item] = tags
+
+        for tag in tags:
+            items = self._tag_items.get(tag)
+            if items is None:
+                items = self._tag_items[tag] = set()
+                for gram in self._tag_grams(tag):
+                    self._grams[gram].add(tag)
+            items.add(item)
+
+    def remove(self, item):
+        """Remove an item from the index
+
+        Args:
+            item (object): the indexed item
+
+        Returns:
+            None
+
+        """
+
+        tags = self._items.pop(item, None)
+        if tags is None:
+            return
+
+        self.revision += 1
+        for tag in tags:
+            items = self._tag_items[tag]
+            items.discard(item)
+            if items:
+                continue
+
+            # Last item with this tag, drop the tag from its grams
+            del self._tag_items[tag]
+            for gram in self._tag_grams(tag):
+                tags_with_gram = self._grams[gram]
+                tags_with_gram.discard(tag)
+                if not tags_with_gram:
+                    del self._grams[gram]
+
+    def clear(self):
+        """Remove all items from the index"""
+        self.revision += 1
+        self._items.clear()
+        self._tag_items.clear()
+        self._grams.clear()
+
+    def restore(self, entries, grams):
+        """Add many items at once with the grams stored by `dump_grams`
+
+        Looking up the grams of every tag is the slowest part of adding
+        items, restoring them skips it. An index which is not empty adds
+        the items one by one instead.
+
+        Args:
+            entries (list): tuples of each item with its tags
+            grams (dict): the tags of each gram holding at least the tags
+                          of the items
+
+        Returns:
+            None
+
+        """
+
+        if self._items:
+            for item, tags in entries:
+                self.add(item, tags)
+            return
+
+        self.revision += 1
+        for item, tags in entries:
+            tags = tuple(set(sys.intern(str(tag)) for tag in tags))
+            self._items[item] = tags
+            for tag in tags:
+                items = self._tag_items.get(tag)
+                if items is None:
+                    items = self._tag_items[tag] = set()
+                items.add(item)
+
+        # Only keep tags which are indexed, queries look up their items
+        indexed = self._tag_items.keys()
+        for gram, tags in grams.items():
+            tags = set(tags)
+            if not tags <= indexed:
+                tags &= indexed
+            if tags:
+                self._grams[gram] = tags
+
+    def dump_grams(self, tags):
+        """Return the grams of the tags to restore them with `restore`
+
+        Args:
+            tags (set): the tags to return the grams of
+
+        Returns:
+            dict: the tags of each gram
+
+        """
+        grams = dict()
+        for gram, tags_with_gram in self._grams.items():
+            tags_with_gram = tags_with_gram & tags
+            if tags_with_gram:
+                grams[gram] = tags_with_gram
+        return grams
+
+    def tags(self, item):
+        """Return the indexed tags of an item
+
+        Args:
+            item (object): the indexed item
+
+        Returns:
+            tuple
+
+        """
+        return self._items.get(item, tuple())
+
+    def matches(self, item, text):
+        """Check whether a single item has a tag containing the text
+
+        Args:
+            item (object): the indexed item
+            text (str): the (partial) tag to search for
+
+        Returns:
+            bool
+
+        """
+        return any(text in tag for tag in self._items.get(item, tuple()))
+
+    def query(self, text):
+        """Return all items which have a tag containing the text
+
+        Args:
+            text (str): the (partial) tag to search for
+
+        Returns:
+            set: the matching items
+
+        """
+
+        if not text:
+            return set(self._items)
+
+        items = set()
+        for tag in self._match_tags(text):
+            items.update(self._tag_items[tag])
+
+        return items
+
+    def memory_footprint(self):
+        """Return the approximate memory used by the index in bytes
+
+        Strings are counted once as they are interned and shared between
+        the tables.
+
+        Returns:
+            int
+
+        """
+
+        size = sum(sys.getsizeof(table) for table in
+                   (self._items, self._tag_items, self._grams))
+
+        strings = set()
+        for tags in self._items.values():
+            size += sys.getsizeof(tags)
+        for tag, items in self._tag_items.items():
+            size += sys.getsizeof(items)
+            strings.add(tag)
+        for gram, tags in self._grams.items():
+            size += sys.getsizeof(tags)
+            strings.add(gram)
+
+        size += sum(sys.getsizeof(string) for string in strings)
+
+        return size
+
+    def _match_tags(self, text):
+        """Return all indexed tags which contain the text"""
+
+        if len(text) <= self.GRAM:
+            return self._grams.get(text, set())
+
+        # Intersect starting from the rarest gram to keep the sets small
+        grams = sorted((self._grams.get(gram, set()) for gram in
+                        self._text_grams(text)), key=len)
+        candidates = set(grams[0])
+        for tags in grams[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(tags)
+
+        return set(tag for tag in candidates if text in tag)
+
+    def _tag_grams(self, tag):
+        """Return all unique substrings of the tag up to `GRAM` long"""
+        grams = set()
+        for size in range(1, self.GRAM + 1):
+            for start in range(len(tag) - size + 1):
+                grams.add(tag[start:start + size])
+        return grams
+
+    def _text_grams(self, text):
+        """Return the `GRAM` long substrings of a query"""
+        size = self.GRAM
+        return set(text[start:start + size] for start in
+                   range(len(text) - size + 1))
+
+
+class IncrementalSearch(object):
+    """Narrow down the matches of the previous query while typing
+
+    A query which contains the previous query can only match a subset of
+    the previous matches, so only those are checked again. The results of
+    the previous queries are kept on a stack which makes removing
+    characters from the query a lookup.
+
+    The stack is dropped whenever the index changes.
+
+    """
+
+    def __init__(self, index):
+
+        self._index = index
+        self._revision = index.revision
+        self._stack = []
+
+    def reset(self):
+        """Drop all cached results"""
+        self._revision = self._index.revision
+        self._stack = []
+
+    def query(self, text):
+        """Return all items which have a tag containing the text
+
+        Args:
+            text (str): the (partial) tag to search for
+
+        Returns:
+            frozenset: the matching items
+
+        """
+
+        if not text or self._revision != self._index.revision:
+            self.reset()
+            if not text:
+                return frozenset(self._index.query(text))
+
+        # Fall back to the last query this one extends
+        while self._stack and self._stack[-1][0] not in text:
+            self._stack.pop()
+
+        if self._stack:
+            previous, matches = self._stack[-1]
+            if previous == text:
+                return matches
+
+            matches = frozenset(item for item in matches if
+                                self._index.matches(item, text))
+        else:
+            matches = frozenset(self._index.query(text))
+
+        self._stack.append((text, matches))
+
+        return matches
+
+
+class RankedIndex(object):
+    """Rank items by how well their title, tags, label and tooltip match
+
+    Each field holds its own index. A match scores the weight of its field
+    times the quality of the match: the whole text, its start, the start of
+    a word, anywhere in the text or, when there are not enough of those,
+    the characters of the query in order. An item scores its best match.
+
+    The tiers of matches are visited from the highest score down, shorter
+    strings first within a tier, and the search stops as soon as `limit`
+    items are found. This gives the top items without scoring every item.
+    Items can be boosted, e.g. by how often they are used, these few items
+    are scored one by one.
+
+    """
+
+    FIELDS = (("title", 4.0),
+              ("tags", 3.0),
+              ("label", 2.0),
+              ("tooltip", 1.0))
+
+    EXACT = 1.0
+    PREFIX = 0.9
+    WORD = 0.8
+    SUBSTRING = 0.6
+    FUZZY = 0.3
+
+    # The score added for a boost of 1
+    BOOST = 0.5
+
+    def __init__(self):
+
+        self._fields = [_FieldIndex() for _ in self.FIELDS]
+
+        # Fields and match qualities ordered by their score
+        tiers = [(weight * quality, field, quality)
+                 for field, (_, weight) in enumerate(self.FIELDS)
+                 for quality in (self.EXACT, self.PREFIX, self.WORD,
+                                 self.SUBSTRING)]
+        self._tiers = [(field, quality) for _, field, quality in
+                       sorted(tiers, key=lambda tier: -tier[0])]
+
+        # Characters found in order are only matched after all others, the
+        # fields are ordered by weight
+        self._tiers.extend((field, self.FUZZY)
+                           for field in range(len(self.FIELDS)))
+
+    def __len__(self):
+        return len(self._fields[0])
+
+    def __contains__(self, item):
+        return item in self._fields[0]
+
+    def add(self, item, title, tags=None, label=None, tooltip=None):
+        """Add an item to the index
+
+        When the item is already indexed its values are replaced.
+
+        Args:
+            item (object): hashable item to index, e.g. an Action
+            title (str): the title of the item
+            tags (list, tuple): the tags of the item
+            label (str): the label of the item
+            tooltip (str): the tooltip of the item
+
+        Returns:
+            None
+
+        """
+        values = ((title,), tags or (), (label,), (tooltip,))
+        for index, strings in zip(self._fields, values):
+            # One line per string, fuzzy matching relies on it
+            index.add(item, [" ".join(string.lower().split())
+                             for string in strings if string])
+
+    def remove(self, item):
+        """Remove an item from the index"""
+        for index in self._fields:
+            index.remove(item)
+
+    def memory_footprint(self):
+        """Return the approximate memory used by the index in bytes
+
+        Returns:
+            int
+
+        """
+        return sum(index.memory_footprint() for index in self._fields)
+
+    def clear(self):
+        """Remove all items from the index"""
+        for index in self._fields:
+            index.clear()
+
+    def query(self, text, limit=20, boosts=None):
+        """Return the items matching the text best
+
+        Args:
+            text (str): the text to search for
+            limit (int): the maximum number of items to return
+            boosts (dict): items with a value between 0 and 1 of which
+                           `BOOST` times the value is added to their score,
+                           e.g. by how often they are used
+
+        Returns:
+            list: the items, best match first
+
+        """
+
+        text = " ".join(text.lower().split())
+        if not text or limit <= 0:
+            return []
+
+        if boosts:
+            return self._query_boosted(text, limit, boosts)
+
+        results = []
+        seen = set()
+        for _, index, strings in self._candidates(text):
+            if len(results) >= limit:
+                break
+            self._collect(index, strings, limit, results, seen)
+
+        return results
+
+    def _query_boosted(self, text, limit, boosts):
+        """Return the items with the highest score including their boost
+
+        The best items which are not boosted are collected as usual, the
+        boosted items are scored one by one and merged with them.
+
+        """
+
+        # Skip the boosted items while collecting the others
+        results = []
+        seen = set(boosts)
+        for score, index, strings in self._candidates(text):
+            if len(results) >= limit:
+                break
+            count = len(results)
+            self._collect(index, strings, limit, results, seen)
+            results[count:] = [(score, item) for item in results[count:]]
+
+        word = re.compile(_WORD_START + re.escape(text))
+        fuzzy = re.compile("".join("[^{0}]*{0}".format(re.escape(char))
+                                   for char in text))
+        for item, boost in boosts.items():
+            score = self._score(item, text, word, fuzzy)
+            if score:
+                results.append((score + self.BOOST * boost, item))
+
+        # Sorting is stable, equal scores keep the order they were found in
+        results.sort(key=lambda result: -result[0])
+        return [item for _, item in results[:limit]]
+
+    def _score(self, item, text, word, fuzzy):
+        """Return the best score of the fields of an item
+
+        Returns:
+            float: 0 when the item does not match
+
+        """
+
+        best = 0.0
+        for index, (_, weight) in zip(self._fields, self.FIELDS):
+            for string in index.strings(item):
+                if string == text:
+                    quality = self.EXACT
+                elif string.startswith(text):
+                    quality = self.PREFIX
+                elif text not in string:
+                    quality = self.FUZZY if fuzzy.match(string) else 0.0
+                elif word.search(string):
+                    quality = self.WORD
+                else:
+                    quality = self.SUBSTRING
+                best = max(best, weight * quality)
+
+        return best
+
+    def _candidates(self, text):
+        """Yield the strings matching the text per tier, best tier first
+
+        Yields:
+            tuple: the score of the tier, the field index and its strings
+
+        """
+
+        # Each field hands out its tiers best first, when they are needed
+        tiers = [index.tiers(text) for index in self._fields]
+        for field, quality in self._tiers:
+            index = self._fields[field]
+            if quality == self.FUZZY:
+                strings = index.fuzzy(text)
+            else:
+                strings = next(tiers[field], None)
+                if strings is None:
+                    continue
+            yield self.FIELDS[field][1] * quality, index, strings
+
+    def _collect(self, index, strings, limit, results, seen):
+        """Add the items of ordered strings until the results are full"""
+        for string in strings:
+            for item in index.items(string):
+                if item in seen:
+                    continue
+                seen.add(item)
+                results.append(item)
+                if len(results) >= limit:
+                    return
+
+
+class _FieldIndex(object):
+    """Index of the strings of one field, searched as lines of text
+
+    All strings are joined on separate lines, shortest first. Searching the
+    lines with regular expressions finds the matching strings in order of
+    their length without a loop over the strings, so a query can stop once
+    it has found enough of them.
+
+    """
+
+    def __init__(self):
+
+        self._items = dict()
+        self._strings = dict()
+
+        self.revision = 0
+        self._lines = (None, "")
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def add(self, item, strings):
+        """Add an item with the strings of its field, replacing old ones"""
+        if item in self._items:
+            self.remove(item)
+
+        self.revision += 1
+        strings = tuple(set(sys.intern(string) for string in strings))
+        self._items[item] = strings
+        for string in strings:
+            items = self._strings.get(string)
+            if items is None:
+                items = self._strings[string] = set()
+            items.add(item)
+
+    def remove(self, item):
+        """Remove an item from the index"""
+        strings = self._items.pop(item, None)
+        if strings is None:
+            return
+
+        self.revision += 1
+        for string in strings:
+            items = self._strings[string]
+            items.discard(item)
+            if not items:
+                del self._strings[string]
+
+    def clear(self):
+        """Remove all items from the index"""
+        self.revision += 1
+        self._items.clear()
+        self._strings.clear()
+        self._lines = (None, "")
+
+    def memory_footprint(self):
+        """Return the approximate memory used by the field in bytes"""
+        size = sys.getsizeof(self._items) + sys.getsizeof(self._strings)
+        size += sum(sys.getsizeof(strings) for strings in
+                    self._items.values())
+        for string, items in self._strings.items():
+            size += sys.getsizeof(string) + sys.getsizeof(items)
+        return size + sys.getsizeof(self._lines[1])
+
+    def items(self, string):
+        """Return the items of which the field holds the string"""
+        return self._strings.get(string, ())
+
+    def strings(self, item):
+        """Return the strings of the field of an item"""
+        return self._items.get(item, ())
+
+    def tiers(self, text):
+        """Yield the strings containing the text by quality of the match
+
+        The strings matching the whole text, its start, the start of a word
+        and anywhere are yielded in turn, shortest first. A string can be
+        yielded again in a lower tier.
+
+        """
+
+        yield (text,) if text in self._strings else ()
+
+        lines = self._get_lines()
+        if text not in lines:
+            return
+
+        text = re.escape(text)
+        yield self._search(lines, "\n" + text)
+        yield self._search(lines, _WORD_START + text)
+        yield self._search(lines, text)
+
+    def fuzzy(self, text):
+        """Yield the strings holding the characters of the text in order
+
+        Shorter strings are yielded first. Strings which contain the text as
+        a whole are left out.
+
+        """
+
+        lines = self._get_lines()
+        if not all(char in lines for char in set(text)):
+            return
+
+        # Every character is matched at its first occurrence after the
+        # previous one, which needs no backtracking
+        pattern = "".join("[^{0}\n]*{0}".format(re.escape(char))
+                          for char in text)
+        for string in self._search(lines, "\n" + pattern):
+            if text not in string:
+                yield string
+
+    def _get_lines(self):
+        """Return all strings by length on separate lines"""
+        revision, lines = self._lines
+        if revision != self.revision:
+            lines = "\n{}\n".format("\n".join(_by_length(self._strings)))
+            self._lines = (self.revision, lines)
+        return lines
+
+    def _search(self, lines, pattern):
+        """Yield each line matching the pattern once"""
+        pattern = re.compile(pattern)
+        position = 0
+        while True:
+            match = pattern.search(lines, position)
+            if match is None:
+                return
+
+            # The last character of the match is always on the line
+            last = match.end() - 1
+            start = lines.rfind("\n", 0, last) + 1
+            position = lines.find("\n", last)
+            yield lines[start:position]
+
+
+def _by_length(strings):
+    """Yield the strings, shorter ones first and equally long ones sorted"""
+    for _, group in groupby(sorted(strings, key=len), len):
+        for string in sorted(group):
+            yield string
+
+
+# The characters after which a word starts, a class of literal characters
+# searches a lot faster than a lookbehind or a negated class
+_WORD_START = r"[ _\-./:(\[]"
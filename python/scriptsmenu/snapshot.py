@@ -0,0 +1,142 @@
+import os
+import hashlib
+
+from . import configcache, model, version
+
+# Bumped whenever the layout of the snapshot data changes
+FORMAT = 1
+
+
+def get_snapshot_path(name, inputs, cache_dir=None):
+    """Return the default snapshot file of a menu built from input files
+
+    Args:
+        name (str): the object name of the menu
+        inputs (list): the files the menu is built from
+        cache_dir (str, optional): folder to store the snapshot in
+
+    Returns:
+        str
+
+    """
+    key = "\n".join([name] + [os.path.normcase(os.path.abspath(path))
+                              for path in inputs])
+    key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir or configcache.get_cache_dir(),
+                        "{}.snapshot".format(key))
+
+
+def build_menu(menu, paths, lazy=False):
+    """Build a new menu from files, restored from its snapshot when unchanged
+
+    When building fails the half built menu is detached from its parent
+    before the error is raised, so looking for the menu again does not
+    find it and a new one is built instead.
+
+    Args:
+        menu (ScriptsMenu): the new menu
+        paths (str, list): the configuration file or a list of layers
+        lazy (bool): only create the submenus, their items are created when
+                     a submenu is shown for the first time
+
+    Returns:
+        bool: whether the snapshot was restored
+
+    """
+    try:
+        return menu.build_from_files(paths, lazy=lazy)
+    except Exception:
+        menu.setParent(None)
+        menu.deleteLater()
+        raise
+
+
+def save(path, items, grams, inputs):
+    """Write the model of a built menu and its search grams to a file
+
+    The snapshot is only restored as long as none of the input files
+    changed and the environment variables they use have the same values.
+
+    Args:
+        path (str): the snapshot file
+        items (list): the records of the menu
+        grams (dict): the grams of the search index, see
+                      `SearchIndex.dump_grams`
+        inputs (list): the files the menu was built from
+
+    Returns:
+        None
+
+    """
+
+    variables = set()
+    fingerprints = []
+    for input_path in inputs:
+        input_path = os.path.abspath(input_path)
+        fingerprints.append(configcache.get_fingerprint(input_path))
+        with open(input_path, "r") as f:
+            variables.update(configcache.find_variables(f.read()))
+
+    header = {"version": version.version,
+              "format": FORMAT,
+              "inputs": fingerprints,
+              "environment": configcache.get_environment(variables)}
+    configcache.write_cache(path, header, (encode(items), grams))
+
+
+def load(path, inputs):
+    """Return the model and search grams of a snapshot when it is valid
+
+    Args:
+        path (str): the snapshot file
+        inputs (list): the files the menu is built from
+
+    Returns:
+        tuple: the records and the grams, None when the snapshot is missing
+            or out of date
+
+    """
+
+    header, data = configcache.read_cache(path)
+    if header is None or header.get("format") != FORMAT:
+        return None
+
+    if not configcache.is_valid(header):
+        return None
+
+    try:
+        fingerprints = [configcache.get_fingerprint(os.path.abspath(path))
+                        for path in inputs]
+    except OSError:
+        return None
+    if header.get("inputs") != fingerprints:
+        return None
+
+    items, grams = data
+    return decode(items), grams
+
+
+def encode(items):
+    """Return the records of a menu as nested tuples"""
+    data = []
+    for item in items:
+        if item.type == "action":
+            data.append(("action",) + item.values())
+        elif item.type == "menu":
+            data.append(("menu", item.title, encode(item.items)))
+        else:
+            data.append((item.type,))
+    return tuple(data)
+
+
+def decode(data):
+    """Return the records of a menu from nested tuples"""
+    items = []
+    for entry in data:
+        if entry[0] == "action":
+            items.append(model.ScriptItem(*entry[1:]))
+        elif entry[0] == "menu":
+            items.append(model.MenuItem(entry[1], decode(entry[2])))
+        else:
+            items.append(model.SeparatorItem())
+    return items
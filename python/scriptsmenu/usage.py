@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import errno
+import logging
+
+from . import configcache
+
+log = logging.getLogger(__name__)
+
+# Seconds after which the lock of a compaction is considered left behind
+_STALE_LOCK = 60
+
+
+def get_usage_path():
+    """Return the file in which the usage of scripts is logged
+
+    The file can be set with the `SCRIPTSMENU_USAGE` environment variable,
+    by default it is stored in the configuration cache folder.
+
+    Returns:
+        str
+
+    """
+    default = os.path.join(configcache.get_cache_dir(), "usage.log")
+    return os.environ.get("SCRIPTSMENU_USAGE", default)
+
+
+class UsageTracker(object):
+    """Remember how often and how recently scripts were run
+
+    Every run is appended to a log file as a single line, which keeps the
+    file consistent when several sessions write to it at the same time.
+    The log is loaded into a table of scripts by their title and command
+    when the tracker is created and compacted to one line per script once
+    it grows too long.
+
+    Each run adds 1 to the score of a script, which halves every
+    `half_life` seconds so recent runs count more than old ones.
+
+    """
+
+    def __init__(self, path=None, half_life=14 * 24 * 3600,
+                 compact_lines=10000):
+        """Initialize the tracker and load the log
+
+        Args:
+            path (str): the log file, see `get_usage_path`
+
+            half_life (float): seconds after which a run counts half
+
+            compact_lines (int): number of runs in the log after which it
+                                 is compacted
+
+        """
+
+        self.path = path or get_usage_path()
+        self.half_life = float(half_life)
+        self.compact_lines = compact_lines
+
+        # Script key with its number of runs, score and time of the score
+        self._table = dict()
+        self._lines = 0
+
+        self.load()
+
+    def __len__(self):
+        return len(self._table)
+
+    def load(self):
+        """Read the log into the table, compacting it when it is too long
+
+        Returns:
+            None
+
+        """
+
+        self._table.clear()
+        self._lines = 0
+
+        try:
+            self._read(0)
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                log.warning("Can't read usage log: {}".format(e))
+            return
+
+        if self._lines > self.compact_lines + len(self._table):
+            self.compact()
+
+    def record(self, title, command, now=None):
+        """Log a run of a script
+
+        Args:
+            title (str): the title of the script
+            command (str): the command of the script
+            now (float): the time of the run, defaults to the current time
+
+        Returns:
+            None
+
+        """
+
+        now = time.time() if now is None else now
+        self._add(title, command, 1, 1.0, now)
+        self._append([[now, title, command]])
+
+    def count(self, title, command):
+        """Return the number of runs of a script"""
+        entry = self._table.get((title, command))
+        return entry[0] if entry else 0
+
+    def score(self, title, command, now=None):
+        """Return the score of a script, its runs weighed by their age
+
+        Returns:
+            float
+
+        """
+        entry = self._table.get((title, command))
+        if entry is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return entry[1] * self._decay(now - entry[2])
+
+    def boost(self, title, command, now=None):
+        """Return the score of a script scaled between 0 and 1
+
+        Returns:
+            float: 0 for scripts which never ran, 0.5 for a score of 1
+
+        """
+        score = self.score(title, command, now)
+        return score / (score + 1.0)
+
+    def hottest(self, limit=None, now=None):
+        """Return the scripts with the highest score
+
+        Args:
+            limit (int): the maximum number of scripts, all by default
+            now (float): the time to score at, defaults to the current time
+
+        Returns:
+            list: (title, command) tuples, highest score first
+
+        """
+        now = time.time() if now is None else now
+        keys = sorted(self._table, key=lambda key: -self.score(*key,
+                                                               now=now))
+        return keys[:limit] if limit is not None else keys
+
+    def compact(self):
+        """Rewrite the log with one line per script
+
+        Only one session compacts at a time. Runs logged by other sessions
+        while compacting are kept, except for a run written at the very
+        moment the log is replaced.
+
+        Returns:
+            bool: whether the log was compacted
+
+        """
+
+        lock = self.path + ".lock"
+        try:
+            if time.time() - os.path.getmtime(lock) > _STALE_LOCK:
+                # Left behind by a session which crashed while compacting
+                os.remove(lock)
+        except OSError:
+            pass
+
+        try:
+            descriptor = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError:
+            # Compacted by another session right now
+            return False
+
+        temp = self.path + ".tmp"
+        try:
+            # Start from the log including the runs of other sessions
+            self._table.clear()
+            self._lines = 0
+            end = self._read(0)
+
+            with open(temp, "w") as f:
+                for (title, command), (count, score, updated) \
+                        in self._table.items():
+                    f.write(json.dumps([updated, title, command, count,
+                                        score]) + "\n")
+
+                # Keep the runs logged in the meantime
+                with open(self.path, "r") as log_file:
+                    log_file.seek(end)
+                    recent = log_file.read()
+                f.write(recent)
+
+            os.replace(temp, self.path)
+            self._table.clear()
+            self._lines = 0
+            self._read(0)
+        except (IOError, OSError) as e:
+            log.warning("Can't compact usage log: {}".format(e))
+            return False
+        finally:
+            os.close(descriptor)
+            os.remove(lock)
+
+        return True
+
+    def _read(self, offset):
+        """Add the lines of the log after offset to the table
+
+        Returns:
+            int: the offset of the end of the log
+
+        """
+        with open(self.path, "r") as f:
+            f.seek(offset)
+            for line in f:
+                self._read_line(line)
+            return f.tell()
+
+    def _read_line(self, line):
+        """Add a line of the log to the table, skipping broken lines"""
+        try:
+            entry = json.loads(line)
+            if len(entry) == 3:
+                now, title, command = entry
+                count, score = 1, 1.0
+            else:
+                now, title, command, count, score = entry
+        except (ValueError, TypeError):
+            # Written partially, e.g. when a session crashed
+            return
+
+        self._add(title, command, count, score, now)
+        self._lines += 1
+
+    def _add(self, title, command, count, score, now):
+        """Add runs to the score of a script"""
+        key = (title, command)
+        entry = self._table.get(key)
+        if entry is None:
+            self._table[key] = (count, score, now)
+            return
+
+        # Decay the older score to the newer time
+        old_count, old_score, updated = entry
+        if now >= updated:
+            score += old_score * self._decay(now - updated)
+        else:
+            score = old_score + score * self._decay(updated - now)
+            now = updated
+        self._table[key] = (old_count + count, score, now)
+
+    def _decay(self, age):
+        return 0.5 ** (max(age, 0.0) / self.half_life)
+
+    def _append(self, entries):
+        """Append entries to the log with a single write"""
+
+        data = "".join(json.dumps(entry) + "\n" for entry in entries)
+        try:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+
+            # Appending writes at the end of the file, even when another
+            # session wrote to it since it was opened
+            descriptor = os.open(self.path,
+                                 os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(descriptor, data.encode("utf-8"))
+            finally:
+                os.close(descriptor)
+        except (IOError, OSError) as e:
+            log.warning("Can't write usage log: {}".format(e))
+            return
+
+        self._lines += len(entries)
+        if self._lines > self.compact_lines + len(self._table):
+            self.compact()
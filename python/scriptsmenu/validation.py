@@ -0,0 +1,355 @@
+import os
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from . import configcache, layers, model
+
+# The source types an action can run
+SOURCETYPES = ("python", "mel", "file")
+
+# Number of files, icons or commands checked per task of the process pool
+CHUNK_SIZE = 250
+
+
+class ValidationReport(object):
+    """The issues found in a configuration
+
+    Every issue is a dictionary with its `severity`, either `error` for
+    items which fail to build or run or `warning` for items which build
+    but are incomplete, the `check` which found it, the `path` of the item
+    in the menu and a `message`.
+
+    """
+
+    def __init__(self, source):
+
+        self.source = source
+        self.items = 0
+        self.duration = 0.0
+        self.issues = []
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues
+                if issue["severity"] == "error"]
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues
+                if issue["severity"] == "warning"]
+
+    def add(self, severity, check, path, message):
+        """Add an issue to the report"""
+        self.issues.append(_issue(severity, check, path, message))
+
+    def as_dict(self):
+        """Return the report as plain data
+
+        Returns:
+            dict
+
+        """
+        return {"source": self.source,
+                "items": self.items,
+                "duration": self.duration,
+                "errors": len(self.errors),
+                "warnings": len(self.warnings),
+                "issues": list(self.issues)}
+
+    def __str__(self):
+        lines = ["{}: {} items, {} errors, {} warnings ({:.2f}s)".format(
+            self.source, self.items, len(self.errors), len(self.warnings),
+            self.duration)]
+        for issue in self.issues:
+            lines.append("  {:<8} {:<12} {}: {}".format(
+                issue["severity"], issue["check"], issue["path"],
+                issue["message"]))
+        return "\n".join(lines)
+
+
+def validate(configuration, source=None, workers=None, compile_code=True):
+    """Check a configuration without building it
+
+    The structure of every item is checked first. The actions are then
+    checked on a pool of processes: the environment variables they use
+    must be set, the scripts of `file` actions and icons must exist and
+    the Python commands and scripts must compile.
+
+    Args:
+        configuration (list): A ScriptsMenu configuration list
+        source (str): the name of the configuration in the report
+        workers (int): the number of processes, by default one per CPU,
+                       0 or 1 checks everything in this process
+        compile_code (bool): compile the Python commands and scripts
+
+    Returns:
+        ValidationReport
+
+    """
+
+    start = time.time()
+    report = ValidationReport(source or "<configuration>")
+
+    actions = []
+    _check_items(configuration, "", report, actions)
+
+    # The actions using each script, icon and command
+    checks = OrderedDict()
+    _collect_checks(actions, report, checks)
+
+    keys = list(checks)
+    chunks = [(keys[position:position + CHUNK_SIZE], compile_code)
+              for position in range(0, len(keys), CHUNK_SIZE)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_run_checks, chunks)
+            results = [problems for chunk in results for problems in chunk]
+    else:
+        results = [problems for chunk in chunks
+                   for problems in _run_checks(chunk)]
+
+    for key, problems in zip(keys, results):
+        for severity, check, message in problems:
+            for path in checks[key]:
+                report.add(severity, check, path, message)
+
+    report.duration = time.time() - start
+    return report
+
+
+def validate_files(paths, merge=False, workers=None, compile_code=True):
+    """Check configuration files without building them
+
+    Args:
+        paths (list): file paths of the .json files
+        merge (bool): check the files as layers merged into one
+                      configuration instead of one by one
+        workers (int): the number of processes, see `validate`
+        compile_code (bool): compile the Python commands and scripts
+
+    Returns:
+        list: a ValidationReport per file or for the merged layers
+
+    """
+
+    loaded = [_load(path) for path in paths]
+    if not merge:
+        return [report or validate(configuration, path, workers, compile_code)
+                for path, (configuration, report) in zip(paths, loaded)]
+
+    failed = [report for _, report in loaded if report is not None]
+    if failed:
+        return failed
+
+    source = " + ".join(paths)
+    try:
+        configuration = layers.merge([configuration for configuration, _
+                                      in loaded])
+    except ValueError as e:
+        report = ValidationReport(source)
+        report.add("error", "schema", "/", str(e))
+        return [report]
+
+    return [validate(configuration, source, workers, compile_code)]
+
+
+def _load(path):
+    """Return the configuration of a file or a report of why it can't load"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f), None
+    except (IOError, OSError, ValueError) as e:
+        report = ValidationReport(path)
+        report.add("error", "json", "/", str(e))
+        return None, report
+
+
+def _check_items(items, path, report, actions):
+    """Check the structure of configuration items and collect the actions"""
+
+    if not isinstance(items, list):
+        report.add("error", "schema", path or "/",
+                   "Expected a list of items, got: {}".format(
+                       type(items).__name__))
+        return
+
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            report.add("error", "schema", "{}/{}".format(path, position),
+                       "Configuration item is not a dict")
+            continue
+
+        item_type = item.get("type")
+        title = item.get("title")
+        item_path = "{}/{}".format(path, title if title is not None
+                                   else position)
+        report.items += 1
+
+        if item_type == "separator":
+            continue
+
+        elif item_type == "menu":
+            if not isinstance(title, str):
+                report.add("error", "schema", item_path,
+                           "Menu is missing a 'title'")
+            if "items" not in item:
+                report.add("error", "schema", item_path,
+                           "Menu is missing 'items' key")
+                continue
+            _check_items(item["items"], item_path, report, actions)
+
+        elif item_type == "action":
+            if _check_action_keys(item, item_path, report):
+                actions.append((item_path, item))
+
+        elif not item_type:
+            report.add("warning", "schema", item_path,
+                       "Missing 'type', the item is skipped")
+
+        else:
+            report.add("warning", "schema", item_path,
+                       "Unknown type '{}', the item is skipped".format(
+                           item_type))
+
+
+def _check_action_keys(item, path, report):
+    """Check the keys of an action
+
+    Returns:
+        bool: whether the action can be checked further
+
+    """
+
+    keys = set(item) - {"type"}
+    unknown = keys - set(configcache.ACTION_KEYS)
+    if unknown:
+        report.add("error", "schema", path, "Unknown keys: {}".format(
+            ", ".join(sorted(unknown))))
+
+    missing = [key for key in ("title", "command", "sourcetype")
+               if not isinstance(item.get(key), str)]
+    if missing:
+        report.add("error", "schema", path, "Missing or invalid keys: "
+                   "{}".format(", ".join(missing)))
+        return False
+
+    sourcetype = item["sourcetype"]
+    if sourcetype not in SOURCETYPES:
+        report.add("error", "schema", path, "Unknown sourcetype '{}', "
+                   "supported: {}".format(sourcetype, ", ".join(SOURCETYPES)))
+        return False
+
+    tags = item.get("tags")
+    if tags is not None and (not isinstance(tags, (list, tuple)) or
+                             not all(isinstance(tag, str) for tag in tags)):
+        report.add("error", "schema", path, "Tags must be a list of "
+                   "strings")
+
+    icon = item.get("icon")
+    if icon is not None and (not isinstance(icon, str) or not icon.strip()):
+        report.add("error", "schema", path, "Icon must be a file path")
+
+    for key in ("label", "tooltip"):
+        if item.get(key) is not None and not isinstance(item[key], str):
+            report.add("error", "schema", path, "'{}' must be a "
+                       "string".format(key))
+
+    execution = item.get("execution") or "main"
+    if execution not in model.EXECUTION_MODES:
+        report.add("error", "schema", path, "Invalid execution '{}', "
+                   "supported: {}".format(execution,
+                                          ", ".join(model.EXECUTION_MODES)))
+    elif (execution != "main" and
+          sourcetype not in model.BACKGROUND_SOURCETYPES):
+        report.add("error", "schema", path, "Only python and file scripts "
+                   "can run in the background")
+
+    return True
+
+
+def _collect_checks(actions, report, checks):
+    """Check the environment of actions and collect what to check on disk
+
+    Actions sharing a script, icon or command are checked once.
+
+    """
+
+    for path, item in actions:
+        icon = item.get("icon")
+        if isinstance(icon, str) and icon.strip():
+            if _check_environment(icon, path, report):
+                key = ("icon", os.path.expandvars(icon))
+                checks.setdefault(key, []).append(path)
+
+        sourcetype = item["sourcetype"]
+        command = item["command"]
+        if sourcetype == "file":
+            if _check_environment(command, path, report):
+                filepath = model.resolve_filepath(command)
+                checks.setdefault(("file", filepath), []).append(path)
+        elif sourcetype == "python":
+            checks.setdefault(("python", command), []).append(path)
+
+
+def _check_environment(text, path, report):
+    """Check whether all environment variables used in a text are set"""
+    missing = sorted(name for name in configcache.find_variables(text)
+                     if name not in os.environ)
+    for name in missing:
+        report.add("error", "environment", path, "Environment variable "
+                   "'{}' is not set in '{}'".format(name, text))
+    return not missing
+
+
+def _run_checks(chunk):
+    """Check files, icons and commands, run in a worker process
+
+    Returns:
+        list: the severity, check and message of every problem found per
+            check
+
+    """
+
+    checks, compile_code = chunk
+    return [_run_check(kind, value, compile_code) for kind, value in checks]
+
+
+def _run_check(kind, value, compile_code):
+    """Return the problems found by a single check"""
+
+    if kind == "icon":
+        if not os.path.isfile(value):
+            return [("warning", "icon", "Icon not found: {}".format(value))]
+        return []
+
+    if kind == "file":
+        try:
+            with open(value, "rb") as f:
+                source = f.read()
+        except (IOError, OSError):
+            return [("error", "file", "Script not found: {}".format(value))]
+        filename = value
+    else:
+        source = value
+        filename = "<command>"
+
+    if compile_code:
+        try:
+            compile(source, filename, "exec")
+        except (SyntaxError, ValueError) as e:
+            return [("error", "syntax", "{}: {}".format(type(e).__name__,
+                                                        e))]
+
+    return []
+
+
+def _issue(severity, check, path, message):
+    return {"severity": severity,
+            "check": check,
+            "path": path,
+            "message": message}
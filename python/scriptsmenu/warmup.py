@@ -0,0 +1,100 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .vendor.Qt import QtCore
+from . import loader
+
+log = logging.getLogger(__name__)
+
+
+class Warmup(QtCore.QObject):
+    """Compile the scripts of `file` actions on a pool of worker threads
+
+    Reading scripts from a network share and compiling them happens ahead
+    of the first click, which then only runs the compiled code. At most
+    `max_workers` scripts are read at once.
+
+    The signals are emitted on the thread of the warm-up, which is the GUI
+    thread: `progress` after every script, `failed` with the path and error
+    of every script which can't be read or compiled and `finished` once all
+    scripts are done. A cancelled warm-up deletes itself once the scripts
+    being compiled are done.
+
+    """
+
+    progress = QtCore.Signal(int, int)
+    failed = QtCore.Signal(str, str)
+    finished = QtCore.Signal()
+
+    _done = QtCore.Signal(str, object)
+
+    def __init__(self, paths, parent=None, max_workers=4):
+        QtCore.QObject.__init__(self, parent)
+
+        self.paths = list(paths)
+        self.done = 0
+        self.failures = dict()
+
+        self._cancelled = threading.Event()
+        self._running = 0
+        self._pool = None
+        self._max_workers = max_workers
+
+        self._done.connect(self._on_done)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def start(self):
+        """Start compiling the scripts"""
+        if not self.paths:
+            self.finished.emit()
+            return
+
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers,
+                                        thread_name_prefix="scriptsmenu")
+        for path in self.paths:
+            self._pool.submit(self._compile, path)
+        self._running = len(self.paths)
+
+        # Threads exit once the queue is empty
+        self._pool.shutdown(wait=False)
+
+    def cancel(self):
+        """Skip the scripts which did not start compiling yet"""
+        self._cancelled.set()
+        if not self._running:
+            self.deleteLater()
+
+    def _compile(self, path):
+        """Compile a script, this is called on a worker thread"""
+        if self.cancelled:
+            self._done.emit(path, None)
+            return
+
+        try:
+            loader.compile_script(path)
+        except Exception as e:
+            self._done.emit(path, "{}: {}".format(type(e).__name__, e))
+        else:
+            self._done.emit(path, None)
+
+    def _on_done(self, path, error):
+        self._running -= 1
+        if self.cancelled:
+            if not self._running:
+                self.deleteLater()
+            return
+
+        self.done += 1
+        if error is not None:
+            log.warning("Script '{}' can't be compiled: {}".format(path,
+                                                                   error))
+            self.failures[path] = error
+            self.failed.emit(path, error)
+
+        self.progress.emit(self.done, len(self.paths))
+        if self.done == len(self.paths):
+            self.finished.emit()
@@ -0,0 +1,163 @@
+import os
+import logging
+
+from .vendor.Qt import QtCore
+
+log = logging.getLogger(__name__)
+
+
+class FileWatcher(QtCore.QObject):
+    """Watch files and report changes once they settle down
+
+    Files are watched with a QFileSystemWatcher. Files it can not watch,
+    or all files when `polling` is enabled for network mounts, are polled
+    instead. Each poll only checks the next `batch_size` files so the cost
+    of a tick does not grow with the number of watched files.
+
+    All changes within the `debounce` window are reported together with a
+    single `changed` signal.
+
+    """
+
+    changed = QtCore.Signal(list)
+
+    def __init__(self, parent=None, polling=False, interval=2000,
+                 debounce=500, batch_size=500):
+        """Initialize the file watcher
+
+        Args:
+            parent (QtCore.QObject): the QObject to parent the watcher to
+
+            polling (bool): poll all files instead of using filesystem
+                            notifications
+
+            interval (int): milliseconds between two polls
+
+            debounce (int): milliseconds to wait for more changes before
+                            emitting `changed`
+
+            batch_size (int): number of files checked per poll
+
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        self.polling = polling
+        self.batch_size = batch_size
+
+        self._paths = set()
+        self._changed = set()
+
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+        # Polled files with their last known modification time and size
+        self._signatures = dict()
+        self._queue = []
+        self._position = 0
+
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.setInterval(interval)
+        self._poll_timer.timeout.connect(self._poll)
+
+        self._debounce_timer = QtCore.QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce)
+        self._debounce_timer.timeout.connect(self._emit_changed)
+
+    def paths(self):
+        """Return the watched file paths"""
+        return sorted(self._paths)
+
+    def set_paths(self, paths):
+        """Watch the given files instead of the current ones
+
+        Args:
+            paths (list): file paths to watch
+
+        Returns:
+            None
+
+        """
+
+        paths = set(os.path.normpath(path) for path in paths)
+
+        removed = self._paths - paths
+        added = paths - self._paths
+        self._paths = paths
+
+        watched = set(self._watcher.files())
+        unwatch = [path for path in removed if path in watched]
+        if unwatch:
+            self._watcher.removePaths(unwatch)
+
+        for path in removed:
+            self._signatures.pop(path, None)
+
+        polled = set(added)
+        if not self.polling and added:
+            # Poll the files which could not be watched, like missing files
+            # or files above the limit of the operating system
+            polled = set(self._watcher.addPaths(list(added)) or [])
+
+        for path in polled:
+            self._signatures[path] = _get_signature(path)
+
+        self._queue = list(self._signatures)
+        self._position = 0
+        if self._queue:
+            self._poll_timer.start()
+        else:
+            self._poll_timer.stop()
+
+    def stop(self):
+        """Stop watching all files"""
+        self.set_paths([])
+        self._debounce_timer.stop()
+        self._changed.clear()
+
+    def _on_file_changed(self, path):
+        # Files replaced on save are dropped by the watcher, watch them again
+        if os.path.exists(path) and path not in self._watcher.files():
+            self._watcher.addPath(path)
+
+        self._add_change(path)
+
+    def _poll(self):
+        """Check the next batch of polled files for changes"""
+
+        if not self._queue:
+            return
+
+        count = min(self.batch_size, len(self._queue))
+        start = self._position % len(self._queue)
+        batch = self._queue[start:start + count]
+        if len(batch) < count:
+            batch += self._queue[:count - len(batch)]
+        self._position = (start + count) % len(self._queue)
+
+        for path in batch:
+            signature = _get_signature(path)
+            if signature != self._signatures.get(path):
+                self._signatures[path] = signature
+                self._add_change(path)
+
+    def _add_change(self, path):
+        self._changed.add(path)
+        self._debounce_timer.start()
+
+    def _emit_changed(self):
+        changed = sorted(self._changed)
+        self._changed.clear()
+
+        log.debug("Files changed: {}".format(", ".join(changed)))
+        self.changed.emit(changed)
+
+
+def _get_signature(path):
+    """Return the modification time and size of a file, None when missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime, stat.st_size